@@ -8,15 +8,24 @@
 NOTE: You should use typing.List instead of list to do type annotation. Because in the markdown extraction process,
   we can use typing to extract the type of the node, but we cannot use built-in list to extract.
 """
+import asyncio
 import json
 import re
 import typing
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
-from pydantic import BaseModel, Field, create_model, model_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    TypeAdapter,
+    ValidationError,
+    create_model,
+    model_validator,
+)
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
+from ohm.actions.action_graph import ActionGraph
 from ohm.actions.action_outcls_registry import register_action_outcls
 from ohm.const import MARKDOWN_TITLE_PREFIX, USE_CONFIG_TIMEOUT
 from ohm.exp_pool import exp_cache
@@ -27,6 +36,7 @@ from ohm.provider.postprocess.llm_output_postprocess import llm_output_postproce
 from ohm.utils.common import OutputParser, general_after_log
 from ohm.utils.human_interaction import HumanInteraction
 from ohm.utils.sanitize import sanitize
+from ohm.utils.stream_parser import ContentStreamParser
 
 
 class ReviewMode(Enum):
@@ -154,6 +164,7 @@ class ActionNode:
     # Action Output
     content: str
     instruct_content: BaseModel
+    streamed_fields: Dict[str, Any]  # fields validated while the output is still streaming
 
     # For ActionGraph
     prevs: List["ActionNode"]  # previous nodes
@@ -176,6 +187,7 @@ class ActionNode:
         self.content = content
         self.children = children if children is not None else {}
         self.schema = schema
+        self.streamed_fields = {}
         self.prevs = []
         self.nexts = []
 
@@ -436,9 +448,12 @@ class ActionNode:
         timeout=USE_CONFIG_TIMEOUT,
     ) -> (str, BaseModel):
         """Use ActionOutput to wrap the output of aask"""
-        content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
-        logger.debug(f"llm raw output:\n{content}")
         output_class = self.create_model_class(output_class_name, output_data_mapping)
+        if schema == "json" and self.llm.config.stream and self.llm.config.stream_json:
+            content = await self._aask_json_stream(prompt, output_class, images, system_msgs, timeout)
+        else:
+            content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+        logger.debug(f"llm raw output:\n{content}")
 
         if schema == "json":
             parsed_data = llm_output_postprocess(
@@ -451,6 +466,43 @@ class ActionNode:
         instruct_content = output_class(**parsed_data)
         return content, instruct_content
 
+    async def _aask_json_stream(
+        self,
+        prompt: str,
+        output_class: Type[BaseModel],
+        images: Optional[Union[str, list[str]]] = None,
+        system_msgs: Optional[list[str]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+    ) -> str:
+        """Stream the output, validating each top-level field as soon as it is complete.
+
+        The request is aborted once the closing tag arrives, or as soon as the output is clearly malformed, in
+        which case a ValueError is raised so that `_aask_v1` retries without paying for the rest of the answer.
+        """
+        parser = ContentStreamParser(start_tag=f"[{TAG}]", end_tag=f"[/{TAG}]")
+        fields = output_class.model_fields
+        self.streamed_fields = {}
+        chunks = []
+        stream = self.llm.aask_stream(prompt, system_msgs, images=images, timeout=timeout)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                for key, value in parser.feed(chunk):
+                    if key in fields:
+                        try:
+                            value = TypeAdapter(fields[key].annotation).validate_python(value)
+                        except ValidationError as e:
+                            raise ValueError(f"Field {key} of {output_class.__name__} is malformed: {e}")
+                    self.streamed_fields[key] = value
+                    logger.debug(f"field {key} completed")
+                if parser.malformed:
+                    raise ValueError(f"Output of {output_class.__name__} is malformed: {parser.buffer}")
+                if parser.finished:
+                    break
+        finally:
+            await stream.aclose()
+        return "".join(chunks)
+
     def get(self, key):
         return self.instruct_content.model_dump()[key]
 
@@ -606,6 +658,7 @@ class ActionNode:
         timeout=USE_CONFIG_TIMEOUT,
         exclude=[],
         function_name: str = None,
+        concurrency: int = 8,
     ):
         """Fill the node(s) with mode.
 
@@ -625,6 +678,7 @@ class ActionNode:
         :param images: the list of image url or base64 for gpt4-v
         :param timeout: Timeout for llm invocation.
         :param exclude: The keys of ActionNode to exclude.
+        :param concurrency: The maximum number of children filled at the same time with the complex strategy.
         :return: self
         """
         self.set_llm(llm)
@@ -652,16 +706,61 @@ class ActionNode:
             return await self.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
         elif strgy == "complex":
             # 这里隐式假设了拥有children
-            tmp = {}
-            for _, i in self.children.items():
-                if exclude and i.key in exclude:
-                    continue
-                child = await i.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
-                tmp.update(child.instruct_content.model_dump())
-            cls = self._create_children_class()
-            self.instruct_content = cls(**tmp)
+            await self._complex_fill(
+                schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude, concurrency=concurrency
+            )
             return self
 
+    async def _complex_fill(self, schema, mode, images=None, timeout=USE_CONFIG_TIMEOUT, exclude=None, concurrency=8):
+        """Fill children concurrently, merging their outputs in children order.
+
+        A child with `prevs` among its siblings (see ActionGraph.add_edge) waits for them, and their outputs are
+        appended to its context.
+        """
+        children = {k: i for k, i in self.children.items() if not (exclude and i.key in exclude)}
+        self._check_children_acyclic(children)
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def _fill_child(child: "ActionNode") -> "ActionNode":
+            prevs = [prev for prev in child.prevs if prev.key in tasks]
+            if prevs:
+                await asyncio.gather(*[tasks[prev.key] for prev in prevs])
+                outputs = {}
+                for prev in prevs:
+                    outputs.update(prev.instruct_content.model_dump())
+                child.set_context(f"{self.context}\n\n## Dependencies\n{dict_to_markdown(outputs)}")
+            async with semaphore:
+                return await child.simple_fill(
+                    schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude
+                )
+
+        for key, child in children.items():
+            tasks[key] = asyncio.create_task(_fill_child(child))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        tmp = {}
+        for key in children:
+            tmp.update(tasks[key].result().instruct_content.model_dump())
+        cls = self._create_children_class()
+        self.instruct_content = cls(**tmp)
+
+    @staticmethod
+    def _check_children_acyclic(children: dict[str, "ActionNode"]):
+        graph = ActionGraph()
+        for child in children.values():
+            graph.add_node(child)
+            graph.edges[child.key] = [i.key for i in child.nexts if i.key in children]
+        graph.topological_sort()
+        position = {key: idx for idx, key in enumerate(graph.execution_order)}
+        for key, nexts in graph.edges.items():
+            if any(position[key] >= position[i] for i in nexts):
+                raise ValueError(f"Circular dependency among children of {graph.execution_order}")
+
     async def human_review(self) -> dict[str, str]:
         review_comments = HumanInteraction().interact_with_instruct_content(
             instruct_content=self.instruct_content, interact_type="review"
@@ -3,9 +3,32 @@
 # @Desc   : registry to store Dynamic Model from ActionNode.create_model_class to keep it as same Class
 #           with same class name and mapping
 
+from collections import OrderedDict
 from functools import wraps
+from typing import Any, Hashable
 
-action_outcls_registry = dict()
+from pydantic.fields import FieldInfo
+
+# class signature -> generated class, the least recently used ones are evicted beyond the cap
+action_outcls_registry: OrderedDict = OrderedDict()
+ACTION_OUTCLS_REGISTRY_CAP = 4096
+
+
+def _freeze(item: Any) -> Hashable:
+    """Convert the arguments of `create_model_class` to a hashable signature, equal for equal definitions"""
+    if isinstance(item, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in item.items()))
+    if isinstance(item, (list, tuple, set)):
+        frozen = tuple(_freeze(i) for i in item)
+        return tuple(sorted(frozen, key=repr)) if isinstance(item, set) else frozen
+    if isinstance(item, FieldInfo):
+        return "FieldInfo", _freeze(item.default), item.description
+    if isinstance(item, type) or not isinstance(item, Hashable):
+        # eliminate typing influence
+        return str(item).replace("typing.List", "list").replace("typing.Dict", "dict")
+    if type(item).__module__ == "typing":
+        return str(item).replace("typing.List", "list").replace("typing.Dict", "dict")
+    return item
 
 
 def register_action_outcls(func):
@@ -16,27 +39,21 @@ def register_action_outcls(func):
 
     @wraps(func)
     def decorater(*args, **kwargs):
-        """
-        arr example
-            [<class 'ohm.actions.action_node.ActionNode'>, 'test', {'field': (str, Ellipsis)}]
-        """
-        arr = list(args) + list(kwargs.values())
         """
         outcls_id example
-            "<class 'ohm.actions.action_node.ActionNode'>_test_{'field': (str, Ellipsis)}"
+            (<class 'ohm.actions.action_node.ActionNode'>, 'test', (('field', ("<class 'str'>", Ellipsis)),))
         """
-        for idx, item in enumerate(arr):
-            if isinstance(item, dict):
-                arr[idx] = dict(sorted(item.items()))
-        outcls_id = "_".join([str(i) for i in arr])
-        # eliminate typing influence
-        outcls_id = outcls_id.replace("typing.List", "list").replace("typing.Dict", "dict")
+        outcls_id = _freeze(list(args) + list(kwargs.values()))
 
-        if outcls_id in action_outcls_registry:
-            return action_outcls_registry[outcls_id]
+        out_cls = action_outcls_registry.get(outcls_id)
+        if out_cls is not None:
+            action_outcls_registry.move_to_end(outcls_id)
+            return out_cls
 
         out_cls = func(*args, **kwargs)
         action_outcls_registry[outcls_id] = out_cls
+        if len(action_outcls_registry) > ACTION_OUTCLS_REGISTRY_CAP:
+            action_outcls_registry.popitem(last=False)
         return out_cls
 
     return decorater
@@ -15,13 +15,18 @@
             5. Merged the `Config` class of send18:dev branch to take over the set/get operations of the Environment
             class.
 """
+import asyncio
+import hashlib
+import os
 import subprocess
+import sys
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 from pydantic import Field
 
 from ohm.actions.action import Action
+from ohm.const import CONFIG_ROOT
 from ohm.logs import logger
 from ohm.schema import RunCodeContext, RunCodeResult
 from ohm.utils.exceptions import handle_exception
@@ -74,6 +79,23 @@ standard errors:
 ```
 """
 
+RUN_TIMEOUT = 10  # seconds a script may run before it is killed
+MAX_CONCURRENT_RUNS = 4
+VENV_CACHE_ROOT = CONFIG_ROOT / "run_code_venvs"
+VENV_READY_MARKER = ".ready"
+
+# shared by all RunCode instances: locks of the venv builds, keyed by venv directory, and the slots of concurrent runs
+_venv_locks: Dict[str, asyncio.Lock] = {}
+_run_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_run_slots() -> asyncio.Semaphore:
+    # created lazily, inside the running event loop
+    global _run_slots
+    if _run_slots is None:
+        _run_slots = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+    return _run_slots
+
 
 class RunCode(Action):
     name: str = "RunCode"
@@ -100,21 +122,28 @@ class RunCode(Action):
         additional_python_paths = [working_directory] + additional_python_paths
         additional_python_paths = ":".join(additional_python_paths)
         env["PYTHONPATH"] = additional_python_paths + ":" + env.get("PYTHONPATH", "")
-        RunCode._install_dependencies(working_directory=working_directory, env=env)
 
-        # Start the subprocess
-        process = subprocess.Popen(
-            command, cwd=working_directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
-        )
-        logger.info(" ".join(command))
+        async with _get_run_slots():
+            venv_dir = await RunCode._prepare_venv(working_directory=working_directory, env=env)
+            if venv_dir:
+                RunCode._activate_venv(venv_dir, env)
 
-        try:
-            # Wait for the process to complete, with a timeout
-            stdout, stderr = process.communicate(timeout=10)
-        except subprocess.TimeoutExpired:
-            logger.info("The command did not complete within the given timeout.")
-            process.kill()  # Kill the process if it times out
-            stdout, stderr = process.communicate()
+            # Start the subprocess
+            process = await asyncio.create_subprocess_exec(
+                *command, cwd=working_directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+            )
+            logger.info(" ".join(command))
+
+            # Read the pipes outside of the timeout, so the output of a killed process is kept
+            reads = asyncio.gather(process.stdout.read(), process.stderr.read())
+            try:
+                # Wait for the process to complete, with a timeout
+                await asyncio.wait_for(process.wait(), timeout=RUN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.info("The command did not complete within the given timeout.")
+                process.kill()  # Kill the process if it times out
+                await process.wait()
+            stdout, stderr = await reads
         return stdout.decode("utf-8"), stderr.decode("utf-8")
 
     async def run(self, *args, **kwargs) -> RunCodeResult:
@@ -146,28 +175,54 @@ class RunCode(Action):
         return RunCodeResult(summary=rsp, stdout=outs, stderr=errs)
 
     @staticmethod
-    @handle_exception(exception_type=subprocess.CalledProcessError)
-    def _install_via_subprocess(cmd, check, cwd, env):
-        return subprocess.run(cmd, check=check, cwd=cwd, env=env)
+    @handle_exception(exception_type=subprocess.CalledProcessError, default_return=False)
+    async def _install_via_subprocess(cmd, cwd, env) -> bool:
+        logger.info(" ".join(cmd))
+        process = await asyncio.create_subprocess_exec(*cmd, cwd=cwd, env=env)
+        returncode = await process.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
+        return True
 
     @staticmethod
-    def _install_requirements(working_directory, env):
+    def _venv_key(working_directory) -> str:
+        """Hash of the requirements, projects with the same requirements share a virtualenv."""
         file_path = Path(working_directory) / "requirements.txt"
-        if not file_path.exists():
-            return
-        if file_path.stat().st_size == 0:
-            return
-        install_command = ["python", "-m", "pip", "install", "-r", "requirements.txt"]
-        logger.info(" ".join(install_command))
-        RunCode._install_via_subprocess(install_command, check=True, cwd=working_directory, env=env)
+        requirements = file_path.read_bytes() if file_path.exists() else b""
+        return hashlib.sha256(sys.executable.encode("utf-8") + b"\0" + requirements).hexdigest()[:16]
+
+    @staticmethod
+    async def _prepare_venv(working_directory, env) -> Optional[Path]:
+        """Return the cached virtualenv with the requirements and pytest installed, building it on first use.
+
+        The virtualenv sees the system site-packages, so only what is missing there is installed. Returns None if it
+        could not be built, in which case the command runs with the current interpreter.
+        """
+        venv_dir = VENV_CACHE_ROOT / RunCode._venv_key(working_directory)
+        lock = _venv_locks.setdefault(str(venv_dir), asyncio.Lock())
+        async with lock:
+            if (venv_dir / VENV_READY_MARKER).exists():
+                return venv_dir
+
+            venv_dir.parent.mkdir(parents=True, exist_ok=True)
+            python = str(RunCode._venv_bin(venv_dir) / "python")
+            file_path = Path(working_directory) / "requirements.txt"
+            commands = [[sys.executable, "-m", "venv", "--system-site-packages", str(venv_dir)]]
+            if file_path.exists() and file_path.stat().st_size > 0:
+                commands.append([python, "-m", "pip", "install", "-r", "requirements.txt"])
+            commands.append([python, "-m", "pip", "install", "pytest"])
+            for cmd in commands:
+                if not await RunCode._install_via_subprocess(cmd, cwd=working_directory, env=env):
+                    return None
+
+            (venv_dir / VENV_READY_MARKER).touch()
+            return venv_dir
 
     @staticmethod
-    def _install_pytest(working_directory, env):
-        install_pytest_command = ["python", "-m", "pip", "install", "pytest"]
-        logger.info(" ".join(install_pytest_command))
-        RunCode._install_via_subprocess(install_pytest_command, check=True, cwd=working_directory, env=env)
+    def _venv_bin(venv_dir: Path) -> Path:
+        return venv_dir / ("Scripts" if os.name == "nt" else "bin")
 
     @staticmethod
-    def _install_dependencies(working_directory, env):
-        RunCode._install_requirements(working_directory, env)
-        RunCode._install_pytest(working_directory, env)
+    def _activate_venv(venv_dir: Path, env):
+        env["VIRTUAL_ENV"] = str(venv_dir)
+        env["PATH"] = str(RunCode._venv_bin(venv_dir)) + os.pathsep + env.get("PATH", "")
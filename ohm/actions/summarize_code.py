@@ -107,8 +107,8 @@ class SummarizeCode(Action):
         task_pathname = Path(self.i_context.task_filename)
         task_doc = await self.repo.docs.task.get(filename=task_pathname.name)
         code_blocks = []
-        for filename in self.i_context.codes_filenames:
-            code_doc = await self.repo.srcs.get(filename)
+        code_docs = await self.repo.srcs.get_many(self.i_context.codes_filenames)
+        for filename, code_doc in zip(self.i_context.codes_filenames, code_docs):
             code_block = f"```{get_markdown_code_block_type(filename)}\n{code_doc.content}\n```\n---\n"
             code_blocks.append(code_block)
         format_example = FORMAT_EXAMPLE
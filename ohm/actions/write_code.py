@@ -188,18 +188,17 @@ class WriteCode(Action):
         src_file_repo = project_repo.srcs
         # Incremental development scenario
         if use_inc:
-            for filename in src_file_repo.all_files:
+            filenames = src_file_repo.all_files
+            docs = await src_file_repo.get_many(filenames)
+            for filename, doc in zip(filenames, docs):
                 code_block_type = get_markdown_code_block_type(filename)
                 # Exclude the current file from the all code snippets
                 if filename == exclude:
                     # If the file is in the old workspace, use the old code
                     # Exclude unnecessary code to maintain a clean and focused main.py file, ensuring only relevant and
                     # essential functionality is included for the project’s requirements
-                    if filename != "main.py":
-                        # Use old code
-                        doc = await src_file_repo.get(filename=filename)
                     # If the file is in the src workspace, skip it
-                    else:
+                    if filename == "main.py":
                         continue
                     codes.insert(
                         0, f"### The name of file to rewrite: `{filename}`\n```{code_block_type}\n{doc.content}```\n"
@@ -207,7 +206,6 @@ class WriteCode(Action):
                     logger.info(f"Prepare to rewrite `{filename}`")
                 # The code snippets are generated from the src workspace
                 else:
-                    doc = await src_file_repo.get(filename=filename)
                     # If the file does not exist in the src workspace, skip it
                     if not doc:
                         continue
@@ -215,11 +213,10 @@ class WriteCode(Action):
 
         # Normal scenario
         else:
-            for filename in code_filenames:
-                # Exclude the current file to get the code snippets for generating the current file
-                if filename == exclude:
-                    continue
-                doc = await src_file_repo.get(filename=filename)
+            # Exclude the current file to get the code snippets for generating the current file
+            code_filenames = [filename for filename in code_filenames if filename != exclude]
+            docs = await src_file_repo.get_many(code_filenames)
+            for filename, doc in zip(code_filenames, docs):
                 if not doc:
                     continue
                 code_block_type = get_markdown_code_block_type(filename)
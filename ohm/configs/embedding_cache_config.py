@@ -0,0 +1,15 @@
+from pydantic import Field
+
+from ohm.utils.yaml_model import YamlModel
+
+
+class EmbeddingCacheConfig(YamlModel):
+    enabled: bool = Field(default=False, description="Whether to cache text embeddings.")
+    persist_path: str = Field(
+        default=".embedding_cache",
+        description="The directory of the memory-mapped on-disk tier, one subdirectory per model and dimensions.",
+    )
+    memory_max_entries: int = Field(default=10000, description="The capacity of the in-memory LRU tier.")
+    max_segments: int = Field(
+        default=8, description="Segment files of a model are merged into one when it is opened with more than this."
+    )
@@ -3,6 +3,7 @@ from typing import Optional
 
 from pydantic import field_validator
 
+from ohm.configs.embedding_cache_config import EmbeddingCacheConfig
 from ohm.utils.yaml_model import YamlModel
 
 
@@ -46,6 +47,9 @@ class EmbeddingConfig(YamlModel):
     embed_batch_size: Optional[int] = None
     dimensions: Optional[int] = None  # output dimension of embedding model
 
+    # Reuse embeddings of unchanged texts across index rebuilds, see EmbeddingCacheConfig
+    cache: EmbeddingCacheConfig = EmbeddingCacheConfig()
+
     @field_validator("api_type", mode="before")
     @classmethod
     def check_api_type(cls, v):
@@ -23,3 +23,14 @@ class ExperiencePoolConfig(YamlModel):
     )
     use_llm_ranker: bool = Field(default=True, description="Use LLM Reranker to get better result.")
     collection_name: str = Field(default="experience_pool", description="The collection name in chromadb")
+    flush_batch_size: int = Field(
+        default=32, description="New experiences are buffered and written once this many are pending."
+    )
+    flush_interval: float = Field(
+        default=5.0, description="Seconds after which buffered experiences are written on the next write."
+    )
+    compact_ratio: float = Field(
+        default=0.5,
+        description="Rewrite the full storage once the append log holds this fraction of the experiences in it.",
+    )
+    compact_min_entries: int = Field(default=256, description="Minimum number of logged experiences to compact.")
@@ -0,0 +1,20 @@
+from pydantic import Field
+
+from ohm.utils.yaml_model import YamlModel
+
+
+class LLMCacheConfig(YamlModel):
+    enabled: bool = Field(default=False, description="Whether to cache LLM responses.")
+    only_deterministic: bool = Field(
+        default=True, description="Only cache requests sent with temperature 0, whose responses are reproducible."
+    )
+    persist_path: str = Field(
+        default=".llm_cache/responses.sqlite3",
+        description="The SQLite file of the on-disk tier. Set it to empty to keep the cache in memory only.",
+    )
+    memory_max_entries: int = Field(default=1024, description="The capacity of the in-memory LRU tier.")
+    disk_max_entries: int = Field(default=100000, description="The capacity of the on-disk tier.")
+    disk_max_bytes: int = Field(
+        default=512 * 1024 * 1024, description="The maximum total size of responses kept in the on-disk tier."
+    )
+    ttl: int = Field(default=7 * 24 * 3600, description="Seconds before a cached response expires. 0 means never.")
@@ -12,6 +12,7 @@ from typing import Optional
 from pydantic import field_validator
 
 from ohm.configs.compress_msg_config import CompressType
+from ohm.configs.llm_cache_config import LLMCacheConfig
 from ohm.const import CONFIG_ROOT, LLM_API_TIMEOUT, ohm_ROOT
 from ohm.utils.yaml_model import YamlModel
 
@@ -85,6 +86,8 @@ class LLMConfig(YamlModel):
     best_of: Optional[int] = None
     n: Optional[int] = None
     stream: bool = True
+    # Validate json ActionNode outputs field by field while streaming, aborting the request once they end or break
+    stream_json: bool = False
     seed: Optional[int] = None
     # https://cookbook.openai.com/examples/using_logprobs
     logprobs: Optional[bool] = None
@@ -97,16 +100,29 @@ class LLMConfig(YamlModel):
 
     # For Network
     proxy: Optional[str] = None
+    # Connection pool shared by all LLM instances with the same base_url, api_key and proxy
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = True  # only effective when the `h2` package is installed
 
     # Cost Control
     calc_usage: bool = True
 
+    # Rate Control, shared by all instances of the same provider and model. 0 means unlimited.
+    max_concurrency: int = 0  # max in-flight requests
+    rpm: int = 0  # requests per minute
+    tpm: int = 0  # prompt tokens per minute, estimated by `count_tokens`
+
     # Compress request messages under token limit
     compress_type: CompressType = CompressType.NO_COMPRESS
 
     # For Messages Control
     use_system_prompt: bool = True
 
+    # Cache responses of identical requests, see LLMCacheConfig
+    cache: LLMCacheConfig = LLMCacheConfig()
+
     @field_validator("api_key")
     @classmethod
     def check_llm_key(cls, v):
@@ -3,11 +3,12 @@
 
 from __future__ import annotations
 import asyncio
-from typing import Any, Dict, Iterable, Optional, Set
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional, Set
 
 from gymnasium import spaces
 from gymnasium.core import ActType, ObsType
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, SerializeAsAny
 
 from ohm.base import BaseEnvironment, BaseRole
 from ohm.base.base_env_space import BaseEnvAction, BaseEnvObsParams
@@ -38,6 +39,7 @@ class Environment(BaseEnvironment, BaseModel):
                                               exclude=True)
     history: Memory = Field(default_factory=Memory)  # For debug
     context: Context = Field(default_factory=Context, exclude=True)
+    _wakeup: Optional[asyncio.Event] = PrivateAttr(default=None)  # set on publish while `run_event_driven` runs
 
     def reset(
         self,
@@ -70,6 +72,8 @@ class Environment(BaseEnvironment, BaseModel):
                 found = True
         if not found:
             logger.warning(f"Message no recipients: {message.dump()}")
+        elif self._wakeup:
+            self._wakeup.set()
         self.history.add(message)
 
     async def run(self):
@@ -84,6 +88,61 @@ class Environment(BaseEnvironment, BaseModel):
         if futures:
             await asyncio.gather(*futures)
 
+    async def run_event_driven(
+        self,
+        max_runs: int = 3,
+        role_concurrency: Optional[dict[str, int]] = None,
+        before_run: Optional[Callable[[], None]] = None,
+    ):
+        """Run roles as soon as messages land in their buffers, instead of in lockstep rounds.
+
+        Args:
+            max_runs: The maximum number of times each role runs, the counterpart of `n_round`.
+            role_concurrency: Role name to the number of `run` calls of that role allowed in flight. Defaults to 1.
+                Concurrent runs share the state of the role instance, so a limit above 1 only applies to a role that
+                declares itself `reentrant`, others keep one run in flight. Extra concurrent runs only start when the
+                role has unobserved messages in its buffer.
+            before_run: Called before each role run, e.g. a budget check that raises to stop the team.
+        """
+        role_concurrency = dict(role_concurrency or {})
+        for name, limit in list(role_concurrency.items()):
+            role = self.roles.get(name)
+            if limit > 1 and role and not getattr(role, "reentrant", False):
+                logger.warning(f"{name} is not reentrant, it runs one at a time instead of {limit}.")
+                role_concurrency[name] = 1
+        running: dict[str, set[asyncio.Task]] = {name: set() for name in self.roles}
+        runs = Counter()
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                for name, role in self.roles.items():
+                    tasks = running.setdefault(name, set())
+                    if runs[name] >= max_runs or len(tasks) >= role_concurrency.get(name, 1):
+                        continue
+                    if role.is_idle or (tasks and role.rc.msg_buffer.empty()):
+                        continue
+                    if before_run:
+                        before_run()
+                    runs[name] += 1
+                    tasks.add(asyncio.create_task(role.run()))
+
+                pending = set().union(*running.values())
+                if not pending:
+                    break
+                wakeup = asyncio.create_task(self._wakeup.wait())
+                done, _ = await asyncio.wait(pending | {wakeup}, return_when=asyncio.FIRST_COMPLETED)
+                self._wakeup.clear()
+                wakeup.cancel()
+                for tasks in running.values():
+                    finished = tasks & done
+                    tasks -= finished
+                    for task in finished:
+                        task.result()  # propagate exceptions as `asyncio.gather` does
+        finally:
+            self._wakeup = None
+            for task in set().union(*running.values()):
+                task.cancel()
+
     def get_role(self, name: str) -> BaseRole:
         return self.roles.get(name, None)
 
@@ -0,0 +1,165 @@
+"""Exact-match index of experiences, consulted before the retriever."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+from uuid import UUID
+
+from ohm.exp_pool.schema import Experience
+from ohm.logs import logger
+
+EXACT_INDEX_FILENAME = "exp_exact_index.jsonl"
+
+
+class ExperienceExactIndex:
+    """Experience uuids keyed by (tag, hash of req), with a tag -> uuids secondary index.
+
+    The index is persisted as a JSON lines file of the indexed experiences, appended to on each flush and rewritten
+    from the storage when the pool is compacted. In memory only the keys and the offset of each line are kept, so a
+    hit reads back a single line. Lines appended by other processes, and a rewrite of the file, are picked up before
+    each lookup.
+    """
+
+    def __init__(self, directory: str):
+        self.path = Path(directory) / EXACT_INDEX_FILENAME
+        self._by_key: dict[tuple[str, str], list[UUID]] = {}
+        self._by_tag: dict[str, set[UUID]] = {}
+        self._lines: dict[UUID, tuple[int, int]] = {}  # uuid -> (offset, length) of its line in the file
+        self._pending: dict[UUID, Experience] = {}  # added but not persisted yet
+        self._offset = 0  # bytes of the file read so far
+        self._file_id: Optional[tuple[int, int]] = None  # (device, inode) of the file read so far
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @staticmethod
+    def hash_req(req: str) -> str:
+        return hashlib.sha256(req.encode("utf-8")).hexdigest()
+
+    def add(self, exps: Iterable[Experience]):
+        for exp in exps:
+            self._pending[exp.uuid] = exp
+            self._add_key(exp.uuid, exp.tag, self.hash_req(exp.req))
+
+    def get(self, req: str, tag: str = "") -> list[Experience]:
+        """Experiences whose req equals `req`, with the given tag, or with any tag if `tag` is empty."""
+        self.refresh()
+        req_hash = self.hash_req(req)
+        tags = [tag] if tag else list(self._by_tag)
+        exps = []
+        for uuid in [uuid for t in tags for uuid in self._by_key.get((t, req_hash), [])]:
+            exp = self._pending.get(uuid) or self._read(uuid)
+            if exp is not None and exp.req == req:
+                exps.append(exp)
+        return exps
+
+    def get_tag_ids(self, tag: str) -> Optional[set[UUID]]:
+        self.refresh()
+        return self._by_tag.get(tag)
+
+    def load(self):
+        self.refresh()
+
+    def refresh(self):
+        """Read the lines appended to the file since it was last read, or the whole file again if it was replaced.
+
+        Only complete lines are read, a line being written by another process is read next time.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            if self._file_id is not None:
+                self._reset(None)
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            file_id = (stat.st_dev, stat.st_ino)
+            if file_id != self._file_id or stat.st_size < self._offset:
+                self._reset(file_id)
+            if stat.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            data = f.read()
+
+        end = data.rfind(b"\n") + 1
+        offset = self._offset
+        for line in data[:end].splitlines(keepends=True):
+            try:
+                entry = json.loads(line)
+                uuid = UUID(entry["uuid"])
+                self._add_key(uuid, entry.get("tag", ""), self.hash_req(entry["req"]))
+                self._lines[uuid] = (offset, len(line))
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skip a corrupted experience in {self.path}.")
+            offset += len(line)
+        self._offset += end
+
+    def append(self, exps: list[Experience]):
+        """Persist experiences already added to the index."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(exp.model_dump_json() + "\n" for exp in exps))
+            f.flush()
+            os.fsync(f.fileno())
+        self.refresh()
+        for exp in exps:
+            if exp.uuid in self._lines:
+                self._pending.pop(exp.uuid, None)
+
+    def rewrite(self, exps: list[Experience]):
+        """Replace the file with exactly these experiences, e.g. all those of a compacted storage."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{EXACT_INDEX_FILENAME}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(exp.model_dump_json() + "\n" for exp in exps))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        persisted = {exp.uuid for exp in exps}
+        self._pending = {uuid: exp for uuid, exp in self._pending.items() if uuid not in persisted}
+        self.refresh()
+
+    def clear(self):
+        self._pending.clear()
+        self._reset(None)
+        self.path.unlink(missing_ok=True)
+
+    def _read(self, uuid: UUID) -> Optional[Experience]:
+        line = self._lines.get(uuid)
+        if line is None:
+            return None
+        offset, length = line
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read(length)
+        except FileNotFoundError:  # cleared since it was last read
+            self.refresh()
+            return None
+        try:
+            exp = Experience.model_validate_json(data)
+        except ValueError:
+            exp = None
+        if exp is None or exp.uuid != uuid:  # replaced since it was last read
+            self.refresh()
+            return None if self._lines.get(uuid, line) == line else self._read(uuid)
+        return exp
+
+    def _reset(self, file_id: Optional[tuple[int, int]]):
+        """Forget what was read from the file, keeping the experiences not persisted yet."""
+        self._by_key.clear()
+        self._by_tag.clear()
+        self._lines.clear()
+        self._offset = 0
+        self._file_id = file_id
+        for exp in self._pending.values():
+            self._add_key(exp.uuid, exp.tag, self.hash_req(exp.req))
+
+    def _add_key(self, uuid: UUID, tag: str, req_hash: str):
+        if uuid in self._by_tag.get(tag, ()):
+            return
+        self._by_key.setdefault((tag, req_hash), []).append(uuid)
+        self._by_tag.setdefault(tag, set()).add(uuid)
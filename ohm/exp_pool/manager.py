@@ -1,13 +1,18 @@
 """Experience Manager."""
 
+import atexit
+import threading
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from ohm.config2 import Config
 from ohm.configs.exp_pool_config import ExperiencePoolRetrievalType
+from ohm.exp_pool.exact_index import ExperienceExactIndex
 from ohm.exp_pool.schema import DEFAULT_SIMILARITY_TOP_K, Experience, QueryType
+from ohm.exp_pool.segment_log import ExperienceSegmentLog
 from ohm.logs import logger
 from ohm.utils.exceptions import handle_exception
 
@@ -22,6 +27,14 @@ class ExperienceManager(BaseModel):
         config (Config): Configuration for managing experiences.
         _storage (SimpleEngine): Engine to handle the storage and retrieval of experiences.
         _vector_store (ChromaVectorStore): The actual place where vectors are stored.
+
+    New experiences are written behind: they are buffered and added to the storage in batches, when enough are
+    pending, when `flush_interval` has passed, before a query and at exit. A storage that is persisted as a whole
+    (BM25) gets each batch appended to a segment log instead, and is only rewritten when the log has grown in
+    proportion to the storage, so the amortized cost of a write does not grow with the pool.
+
+    An exact-match index of (tag, req) is consulted before the storage: exact queries never reach the retriever, and
+    semantic queries for a tag without any experience return early.
     """
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -29,6 +42,16 @@ class ExperienceManager(BaseModel):
     config: Config = Field(default_factory=Config.default)
 
     _storage: Any = None
+    _exact_index: Optional[ExperienceExactIndex] = None
+    _segment_log: Optional[ExperienceSegmentLog] = None
+    _pending: list[Experience] = []
+    _last_flush: float = 0.0
+    _flush_lock: Any = None
+    _atexit_registered: bool = False
+
+    def model_post_init(self, __context: Any):
+        self._flush_lock = threading.RLock()
+        self._last_flush = time.monotonic()
 
     @property
     def storage(self) -> "SimpleEngine":
@@ -43,6 +66,13 @@ class ExperienceManager(BaseModel):
     def storage(self, value):
         self._storage = value
 
+    @property
+    def exact_index(self) -> ExperienceExactIndex:
+        if self._exact_index is None:
+            self._exact_index = self._resolve_exact_index()
+
+        return self._exact_index
+
     @property
     def is_readable(self) -> bool:
         return self.config.exp_pool.enabled and self.config.exp_pool.enable_read
@@ -87,8 +117,68 @@ class ExperienceManager(BaseModel):
         if not self.is_writable:
             return
 
-        self.storage.add_objs(exps)
-        self.storage.persist(self.config.exp_pool.persist_path)
+        with self._flush_lock:
+            self.exact_index.add(exps)
+            self._pending.extend(exps)
+            if not self._atexit_registered:
+                atexit.register(self.flush)
+                self._atexit_registered = True
+
+            exp_pool = self.config.exp_pool
+            if (
+                len(self._pending) >= exp_pool.flush_batch_size
+                or time.monotonic() - self._last_flush >= exp_pool.flush_interval
+            ):
+                self.flush()
+
+    @handle_exception
+    def flush(self):
+        """Writes the buffered experiences to the storage, compacting the segment log if it has grown too long."""
+
+        with self._flush_lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+
+            exps, self._pending = self._pending, []
+            self.storage.add_objs(exps)
+            if self._segment_log is None:
+                self.exact_index.append(exps)
+                return
+
+            with self._segment_log.lock():  # not in between a compaction and the rewrite of the exact-match index
+                self._segment_log.append(exps)
+                self.exact_index.append(exps)
+            exp_pool = self.config.exp_pool
+            if self._segment_log.entries >= max(
+                exp_pool.compact_min_entries, exp_pool.compact_ratio * self.storage.count()
+            ):
+                self.compact()
+
+    @handle_exception
+    def compact(self):
+        """Persists the whole storage, then drops the segments it now contains and rewrites the exact-match index.
+
+        Compactions of different processes are serialized by the lock of the segment log. If another process
+        persisted a snapshot since this storage was built, the storage is rebuilt on that snapshot first, so none of
+        its experiences are overwritten. Otherwise the experiences other processes logged since are read first.
+        """
+
+        with self._flush_lock:
+            if self._segment_log is None:
+                self.storage.persist(self.config.exp_pool.persist_path)
+                return
+
+            with self._segment_log.lock():
+                if self._segment_log.snapshot_changed():
+                    self._storage = self._resolve_storage()
+                else:
+                    exps = self._segment_log.read_new(include_own=False)
+                    if exps:
+                        self.storage.add_objs(exps)
+                self.storage.persist(self.config.exp_pool.persist_path)
+                self._segment_log.compacted()
+                self.exact_index.rewrite(self._load_stored_exps())
 
     @handle_exception(default_return=[])
     async def query_exps(self, req: str, tag: str = "", query_type: QueryType = QueryType.SEMANTIC) -> list[Experience]:
@@ -97,7 +187,8 @@ class ExperienceManager(BaseModel):
         Args:
             req (str): The query string to retrieve experiences.
             tag (str): Optional tag to filter the experiences by.
-            query_type (QueryType): Default semantic to vector matching. exact to same matching.
+            query_type (QueryType): Default semantic to vector matching. exact to same matching, answered by the
+                exact-match index alone.
 
         Returns:
             list[Experience]: A list of experiences that match the args.
@@ -106,6 +197,13 @@ class ExperienceManager(BaseModel):
         if not self.is_readable:
             return []
 
+        if query_type == QueryType.EXACT:
+            return self.exact_index.get(req, tag=tag)
+
+        if tag and not self.exact_index.get_tag_ids(tag):
+            return []
+
+        self.flush()
         nodes = await self.storage.aretrieve(req)
         exps: list[Experience] = [node.metadata["obj"] for node in nodes]
 
@@ -113,9 +211,6 @@ class ExperienceManager(BaseModel):
         if tag:
             exps = [exp for exp in exps if exp.tag == tag]
 
-        if query_type == QueryType.EXACT:
-            exps = [exp for exp in exps if exp.req == req]
-
         return exps
 
     @handle_exception
@@ -125,13 +220,51 @@ class ExperienceManager(BaseModel):
         if not self.is_writable:
             return
 
-        self.storage.clear(persist_dir=self.config.exp_pool.persist_path)
+        with self._flush_lock:
+            self._pending = []
+            if self._segment_log:
+                with self._segment_log.lock():
+                    self.storage.clear(persist_dir=self.config.exp_pool.persist_path)
+                    self._segment_log.drop()
+            else:
+                self.storage.clear(persist_dir=self.config.exp_pool.persist_path)
+            self.exact_index.clear()
 
     def get_exps_count(self) -> int:
         """Get the total number of experiences."""
 
+        self.flush()
         return self.storage.count()
 
+    def _resolve_exact_index(self) -> ExperienceExactIndex:
+        """Loads the persisted exact-match index, or builds it from the storage for a pool that predates it."""
+
+        exact_index = ExperienceExactIndex(self.config.exp_pool.persist_path)
+        if exact_index.exists:
+            exact_index.load()
+            return exact_index
+
+        exps = self._load_stored_exps()
+        logger.debug(f"Build the exact-match index from {len(exps)} stored experiences.")
+        exact_index.rewrite(exps)
+
+        return exact_index
+
+    def _load_stored_exps(self) -> list[Experience]:
+        """Reads back all experiences from the storage, a BM25 retriever keeps its nodes, Chroma its collection."""
+
+        retriever = self.storage.retriever
+        for r in getattr(retriever, "retrievers", [retriever]):
+            if hasattr(r, "_nodes"):
+                metadatas = [node.metadata for node in r._nodes]
+            elif hasattr(r, "vector_store"):
+                metadatas = r.vector_store._collection.get(include=["metadatas"])["metadatas"]
+            else:
+                continue
+            return [Experience.model_validate_json(m["obj_json"]) for m in metadatas if m.get("obj_json")]
+
+        return []
+
     def _resolve_storage(self) -> "SimpleEngine":
         """Selects the appropriate storage creation method based on the configured retrieval type."""
 
@@ -176,16 +309,30 @@ class ExperienceManager(BaseModel):
             storage = SimpleEngine.from_objs(
                 objs=exps, retriever_configs=retriever_configs, ranker_configs=ranker_configs
             )
-            return storage
+            return self._replay_segment_log(storage)
 
         logger.debug(f"Path `{docstore_path}` exists, try to load bm25 storage.")
-        retriever_configs = [BM25RetrieverConfig(similarity_top_k=DEFAULT_SIMILARITY_TOP_K)]
+        retriever_configs = [
+            BM25RetrieverConfig(similarity_top_k=DEFAULT_SIMILARITY_TOP_K, persist_path=str(persist_path))
+        ]
         storage = SimpleEngine.from_index(
             BM25IndexConfig(persist_path=persist_path),
             retriever_configs=retriever_configs,
             ranker_configs=ranker_configs,
         )
 
+        return self._replay_segment_log(storage)
+
+    def _replay_segment_log(self, storage: "SimpleEngine") -> "SimpleEngine":
+        """Adds the experiences logged since the snapshot was persisted, and logs the following ones."""
+
+        if self._segment_log is None:
+            self._segment_log = ExperienceSegmentLog(self.config.exp_pool.persist_path)
+        exps = self._segment_log.replay()
+        if exps:
+            logger.debug(f"Replay {len(exps)} experiences from the segment log.")
+            storage.add_objs(exps)
+
         return storage
 
     def _create_chroma_storage(self) -> "SimpleEngine":
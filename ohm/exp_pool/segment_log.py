@@ -0,0 +1,132 @@
+"""Append-only log of experiences written since the storage was last persisted."""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from ohm.exp_pool.schema import Experience
+from ohm.logs import logger
+from ohm.utils.file_lock import file_lock, is_process_alive
+
+SEGMENT_GLOB = "exp_segment_*.jsonl"
+MANIFEST_FILENAME = "exp_segments.json"
+LOCK_FILENAME = ".exp_pool.lock"
+
+
+class ExperienceSegmentLog:
+    """Log-structured segment files next to a persisted storage.
+
+    Each writer appends JSON lines to its own segment `exp_segment_{time_ns}_{pid}.jsonl`, so concurrent processes
+    never interleave writes. A manifest records, for the persisted snapshot, its generation and how many bytes of each
+    segment it contains. Segments are replayed past those bytes on top of the snapshot when the storage is loaded.
+
+    Compactions are serialized by a lock file. A segment is only removed once the snapshot contains all of it and no
+    process appends to it any more: the own segment of this process, which then moves on to a new one, or the segment
+    of a process that has exited.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.segment = self._new_segment()
+        self.entries = 0  # experiences logged since the last compaction, replayed ones included
+        self.generation = 0  # generation of the snapshot the storage of this process is built on
+        self._offsets: dict[str, int] = {}  # segment name -> bytes of it in the storage of this process
+
+    def lock(self):
+        """Lock held while the snapshot and the manifest are rewritten."""
+        return file_lock(self.directory / LOCK_FILENAME)
+
+    def append(self, exps: list[Experience]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.segment, "ab") as f:
+            f.write("".join(exp.model_dump_json() + "\n" for exp in exps).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            self._offsets[self.segment.name] = f.tell()
+        self.entries += len(exps)
+
+    def replay(self) -> list[Experience]:
+        """Read the experiences of all segments past the bytes the persisted snapshot contains."""
+        manifest = self._read_manifest()
+        self.generation = manifest["generation"]
+        self._offsets = dict(manifest["segments"])
+        self.entries = 0
+        return self.read_new()
+
+    def read_new(self, include_own: bool = True) -> list[Experience]:
+        """Read the experiences appended to the segments since they were last read.
+
+        Only complete lines are read, a line being written by another process is read next time, and a line torn by a
+        crash is skipped.
+        """
+        exps = []
+        for segment in sorted(self.directory.glob(SEGMENT_GLOB)):
+            if segment == self.segment and not include_own:
+                continue
+            offset = self._offsets.get(segment.name, 0)
+            with open(segment, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                try:
+                    exps.append(Experience.model_validate_json(line))
+                except ValueError:
+                    logger.warning(f"Skip a corrupted experience in {segment}.")
+            self._offsets[segment.name] = offset + end
+        self.entries += len(exps)
+        return exps
+
+    def snapshot_changed(self) -> bool:
+        """Whether another process persisted a snapshot since the storage of this process was built."""
+        return self._read_manifest()["generation"] != self.generation
+
+    def compacted(self):
+        """Record that the snapshot just persisted contains everything read so far, called under `lock`."""
+        segments = {}
+        for segment in self.directory.glob(SEGMENT_GLOB):
+            offset = self._offsets.get(segment.name, 0)
+            if offset >= segment.stat().st_size and (segment == self.segment or not self._is_writer_alive(segment)):
+                segment.unlink(missing_ok=True)
+            elif offset:
+                segments[segment.name] = offset
+        if self._offsets.get(self.segment.name):
+            self.segment = self._new_segment()
+        self._offsets = dict(segments)
+        self.entries = 0
+        self._write_manifest(segments)
+
+    def drop(self):
+        """Remove all segments, called under `lock` after the storage was cleared."""
+        for segment in self.directory.glob(SEGMENT_GLOB):
+            segment.unlink(missing_ok=True)
+        self.segment = self._new_segment()
+        self._offsets = {}
+        self.entries = 0
+        self._write_manifest({})
+
+    def _new_segment(self) -> Path:
+        return self.directory / f"exp_segment_{time.time_ns()}_{os.getpid()}.jsonl"
+
+    @staticmethod
+    def _is_writer_alive(segment: Path) -> bool:
+        try:
+            pid = int(segment.stem.rsplit("_", 1)[1])
+        except (IndexError, ValueError):
+            return True
+        return is_process_alive(pid)
+
+    def _read_manifest(self) -> dict:
+        try:
+            manifest = json.loads((self.directory / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+        return {"generation": manifest.get("generation", 0), "segments": manifest.get("segments", {})}
+
+    def _write_manifest(self, segments: dict[str, int]):
+        self.generation = self._read_manifest()["generation"] + 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{MANIFEST_FILENAME}.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps({"generation": self.generation, "segments": segments}), encoding="utf-8")
+        os.replace(tmp, self.directory / MANIFEST_FILENAME)
@@ -6,10 +6,10 @@
 @File    : memory.py
 @Modified By: mashenquan, 2023-11-1. According to RFC 116: Updated the type of index key.
 """
-from collections import defaultdict
-from typing import DefaultDict, Iterable, Optional, Set
+from itertools import islice
+from typing import Hashable, Iterable, Optional, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny, computed_field
 
 from ohm.const import IGNORED_MESSAGE_ID
 from ohm.schema import Message
@@ -18,21 +18,94 @@ from ohm.utils.exceptions import handle_exception
 
 
 class Memory(BaseModel):
-    """The most basic memory: super-memory"""
+    """The most basic memory: super-memory
 
-    storage: list[SerializeAsAny[Message]] = []
-    index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
+    Messages are kept in insertion order in a dict keyed by a sequence number, and the role and cause_by indexes are
+    dicts keyed by the same number, so adding and deleting a message take constant time. `storage` and `index` are
+    views derived from them, rebuilt when read after a change, so the recent messages are read from the end of the
+    dict rather than through `storage`.
+    """
+
+    seed_storage: list[SerializeAsAny[Message]] = Field(default=[], alias="storage", exclude=True)
     ignore_id: bool = False
 
+    _messages: dict[int, Message] = PrivateAttr(default_factory=dict)
+    _next_seq: int = PrivateAttr(0)
+    # Equal messages share the same key, so membership only compares messages within one bucket.
+    _buckets: dict[Hashable, list[tuple[int, Message]]] = PrivateAttr(default_factory=dict)
+    _role_index: dict[str, dict[int, Message]] = PrivateAttr(default_factory=dict)
+    _action_index: dict[str, dict[int, Message]] = PrivateAttr(default_factory=dict)
+    _storage_view: Optional[list[Message]] = PrivateAttr(None)
+
+    def model_post_init(self, __context):
+        for message in self.seed_storage:
+            self._insert(message)
+        self.seed_storage = []
+
+    @computed_field
+    @property
+    def storage(self) -> list[SerializeAsAny[Message]]:
+        if self._storage_view is None:
+            self._storage_view = list(self._messages.values())
+        return self._storage_view
+
+    @computed_field
+    @property
+    def index(self) -> dict[str, list[SerializeAsAny[Message]]]:
+        return {cause_by: list(messages.values()) for cause_by, messages in self._action_index.items()}
+
+    def _key(self, message: Message) -> Hashable:
+        # all ids are the same when ignore_id is set, fall back to the content to keep buckets small
+        return (message.id, message.content) if self.ignore_id else message.id
+
+    def _find(self, message: Message) -> Optional[int]:
+        """Return the sequence number of the first message equal to `message`, None if there is none."""
+        for seq, m in self._buckets.get(self._key(message), []):
+            if m == message:
+                return seq
+        return None
+
+    def _contains(self, message: Message) -> bool:
+        return self._find(message) is not None
+
+    def _insert(self, message: Message):
+        seq = self._next_seq
+        self._next_seq += 1
+        self._messages[seq] = message
+        self._buckets.setdefault(self._key(message), []).append((seq, message))
+        self._role_index.setdefault(message.role, {})[seq] = message
+        if message.cause_by:
+            self._action_index.setdefault(message.cause_by, {})[seq] = message
+        self._storage_view = None
+
+    def _remove(self, seq: int) -> Message:
+        message = self._messages.pop(seq)
+        key = self._key(message)
+        bucket = self._buckets[key]
+        bucket[:] = [entry for entry in bucket if entry[0] != seq]
+        if not bucket:
+            del self._buckets[key]
+        self._drop_from(self._role_index, message.role, seq)
+        if message.cause_by:
+            self._drop_from(self._action_index, message.cause_by, seq)
+        self._storage_view = None
+        return message
+
+    @staticmethod
+    def _drop_from(index: dict[str, dict[int, Message]], name: str, seq: int):
+        messages = index.get(name)
+        if messages is not None:
+            messages.pop(seq, None)
+            if not messages:
+                del index[name]
+
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+        if self._contains(message):
             return
-        self.storage.append(message)
-        if message.cause_by:
-            self.index[message.cause_by].append(message)
+        self._insert(message)
 
     def add_batch(self, messages: Iterable[Message]):
         for message in messages:
@@ -40,18 +113,16 @@ class Memory(BaseModel):
 
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        return list(self._role_index.get(role, {}).values())
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
-        return [message for message in self.storage if content in message.content]
+        return [message for message in self._messages.values() if content in message.content]
 
     def delete_newest(self) -> "Message":
         """delete the newest message from the storage"""
-        if len(self.storage) > 0:
-            newest_msg = self.storage.pop()
-            if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
-                self.index[newest_msg.cause_by].remove(newest_msg)
+        if self._messages:
+            newest_msg = self._remove(next(reversed(self._messages)))
         else:
             newest_msg = None
         return newest_msg
@@ -60,33 +131,44 @@ class Memory(BaseModel):
         """Delete the specified message from storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        seq = self._find(message)
+        if seq is None:
+            raise ValueError(f"{message} is not in the memory")
+        self._remove(seq)
 
     def clear(self):
         """Clear storage and index"""
-        self.storage = []
-        self.index = defaultdict(list)
+        self._messages = {}
+        self._buckets = {}
+        self._role_index = {}
+        self._action_index = {}
+        self._storage_view = None
 
     def count(self) -> int:
         """Return the number of messages in storage"""
-        return len(self.storage)
+        return len(self._messages)
 
     def try_remember(self, keyword: str) -> list[Message]:
         """Try to recall all messages containing a specified keyword"""
-        return [message for message in self.storage if keyword in message.content]
+        return [message for message in self._messages.values() if keyword in message.content]
 
     def get(self, k=0) -> list[Message]:
         """Return the most recent k memories, return all when k=0"""
-        return self.storage[-k:]
+        if k <= 0 or self._storage_view is not None:
+            return self.storage[-k:]
+        return list(islice(reversed(self._messages.values()), k))[::-1]
 
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
+        if k == 0 or k >= len(self._messages):
+            return [i for i in observed if not self._contains(i)]
+
+        already_observed: dict[Hashable, list[Message]] = {}
+        for message in self.get(k):
+            already_observed.setdefault(self._key(message), []).append(message)
         news: list[Message] = []
         for i in observed:
-            if i in already_observed:
+            if any(m == i for m in already_observed.get(self._key(i), [])):
                 continue
             news.append(i)
         return news
@@ -94,19 +176,29 @@ class Memory(BaseModel):
     def get_by_action(self, action) -> list[Message]:
         """Return all messages triggered by a specified Action"""
         index = any_to_str(action)
-        return self.index[index]
+        return list(self._action_index.get(index, {}).values())
 
     def get_by_actions(self, actions: Set) -> list[Message]:
         """Return all messages triggered by specified Actions"""
         rsp = []
         indices = any_to_str_set(actions)
         for action in indices:
-            if action not in self.index:
+            if action not in self._action_index:
                 continue
-            rsp += self.index[action]
+            rsp += self._action_index[action].values()
         return rsp
 
     @handle_exception
     def get_by_position(self, position: int) -> Optional[Message]:
         """Returns the message at the given position if valid, otherwise returns None"""
-        return self.storage[position]
+        if self._storage_view is not None:
+            return self._storage_view[position]
+        size = len(self._messages)
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("memory index out of range")
+        # walk from the nearer end of the dict
+        if position < size // 2:
+            return next(islice(self._messages.values(), position, None))
+        return next(islice(reversed(self._messages.values()), size - 1 - position, None))
@@ -14,7 +14,7 @@ llm:
   pricing_plan: "doubao-lite"
 ```
 """
-from typing import Optional, Union
+from typing import Union
 
 from pydantic import BaseModel
 from volcenginesdkarkruntime import AsyncArk
@@ -37,16 +37,18 @@ class ArkLLM(OpenAILLM):
     见：https://www.volcengine.com/docs/82379/1263482
     """
 
-    aclient: Optional[AsyncArk] = None
+    http_client_cls = AsyncHttpxClientWrapper  # the sdk only accepts its own httpx wrapper
 
     def _init_client(self):
         """SDK: https://github.com/openai/openai-python#async-usage"""
+        super()._init_client()
         self.model = (
             self.config.endpoint or self.config.model
         )  # endpoint name, See more: https://console.volcengine.com/ark/region:ark+cn-beijing/endpoint
         self.pricing_plan = self.config.pricing_plan or self.model
-        kwargs = self._make_client_kwargs()
-        self.aclient = AsyncArk(**kwargs)
+
+    def _make_client(self, http_client: AsyncHttpxClientWrapper) -> AsyncArk:
+        return AsyncArk(**self._make_client_kwargs(), http_client=http_client)
 
     def _make_client_kwargs(self) -> dict:
         kvs = {
@@ -55,13 +57,7 @@ class ArkLLM(OpenAILLM):
             "api_key": self.config.api_key,
             "base_url": self.config.base_url,
         }
-        kwargs = {k: v for k, v in kvs.items() if v}
-
-        # to use proxy, openai v1 needs http_client
-        if proxy_params := self._get_proxy_params():
-            kwargs["http_client"] = AsyncHttpxClientWrapper(**proxy_params)
-
-        return kwargs
+        return {k: v for k, v in kvs.items() if v}
 
     def _update_costs(self, usage: Union[dict, BaseModel], model: str = None, local_calc_usage: bool = True):
         if next(iter(DOUBAO_TOKEN_COSTS)) not in self.cost_manager.token_costs:
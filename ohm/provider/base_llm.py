@@ -10,7 +10,8 @@ from __future__ import annotations
 
 import json
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Union
 
 from openai import AsyncOpenAI
 from pydantic import BaseModel
@@ -27,6 +28,8 @@ from ohm.configs.llm_config import LLMConfig
 from ohm.const import IMAGES, LLM_API_TIMEOUT, USE_CONFIG_TIMEOUT
 from ohm.logs import logger
 from ohm.provider.constant import MULTI_MODAL_MODELS
+from ohm.provider.llm_cache import CacheStats, LLMResponseCache, get_llm_cache, make_cache_key
+from ohm.provider.rate_limiter import get_rate_limiter
 from ohm.utils.common import log_and_reraise
 from ohm.utils.cost_manager import CostManager, Costs
 from ohm.utils.token_counter import TOKEN_MAX
@@ -127,11 +130,58 @@ class BaseLLM(ABC):
             except Exception as e:
                 logger.error(f"{self.__class__.__name__} updates costs failed! exp: {e}")
 
+    def _update_cache_stats(self, hit: bool):
+        """count a response cache lookup on the cost manager, next to the costs of the requests that missed"""
+        if self.cost_manager:
+            try:
+                self.cost_manager.update_cache_stats(hit)
+            except Exception as e:
+                logger.error(f"{self.__class__.__name__} updates cache stats failed! exp: {e}")
+
     def get_costs(self) -> Costs:
         if not self.cost_manager:
             return Costs(0, 0, 0, 0)
         return self.cost_manager.get_costs()
 
+    @property
+    def response_cache(self) -> Optional[LLMResponseCache]:
+        return get_llm_cache(self.config.cache)
+
+    def get_cache_stats(self) -> CacheStats:
+        cache = self.response_cache
+        return cache.stats if cache else CacheStats()
+
+    @asynccontextmanager
+    async def _rate_limit(self, messages: list[dict]) -> AsyncIterator[None]:
+        """Queue the request behind the provider's concurrency/RPM/TPM limits configured in LLMConfig."""
+        limiter = get_rate_limiter(self.config, self.model)
+        if not limiter:
+            yield
+            return
+        tokens = self.count_tokens(messages) if self.config.tpm else 0
+        async with limiter.limit(tokens):
+            yield
+
+    def _cache_key(self, messages: list[dict], tools: Optional[list[dict]] = None) -> Optional[str]:
+        """Return the cache key of a request, None if the request should not be cached."""
+        cache_config = self.config.cache
+        if not cache_config.enabled:
+            return None
+        if cache_config.only_deterministic and self.config.temperature != 0:
+            return None
+        model = self.pricing_plan or self.model or self.config.model
+        return make_cache_key(model, self.config.temperature, messages, tools)
+
+    def _get_cached_response(self, cache_key: Optional[str]):
+        """Return the cached response of a request, None on a miss or if the request is not cached."""
+        if not cache_key:
+            return None
+        rsp = self.response_cache.get(cache_key)
+        self._update_cache_stats(hit=rsp is not None)
+        if rsp is not None:
+            logger.debug(f"LLM response cache hit: {cache_key}")
+        return rsp
+
     async def aask(
         self,
         msg: Union[str, list[dict[str, str]]],
@@ -141,6 +191,41 @@ class BaseLLM(ABC):
         timeout=USE_CONFIG_TIMEOUT,
         stream=None,
     ) -> str:
+        message = self._build_messages(msg, system_msgs, format_msgs, images)
+        if stream is None:
+            stream = self.config.stream
+        compressed_message = self.compress_messages(message, compress_type=self.config.compress_type)
+        cache_key = self._cache_key(compressed_message)
+        if (rsp := self._get_cached_response(cache_key)) is not None:
+            return rsp
+        rsp = await self.acompletion_text(compressed_message, stream=stream, timeout=self.get_timeout(timeout))
+        # rsp = await self.acompletion_text(message, stream=stream, timeout=self.get_timeout(timeout))
+        if cache_key and rsp:
+            self.response_cache.set(cache_key, rsp)
+        return rsp
+
+    async def aask_stream(
+        self,
+        msg: Union[str, list[dict[str, str]]],
+        system_msgs: Optional[list[str]] = None,
+        format_msgs: Optional[list[dict[str, str]]] = None,
+        images: Optional[Union[str, list[str]]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+    ) -> AsyncIterator[str]:
+        """Same as `aask`, but yield the response as deltas while it is generated.
+
+        Providers without native streaming yield the whole response at once. Stopping the iteration early aborts
+        the request where the provider supports it.
+        """
+        yield await self.aask(msg, system_msgs, format_msgs, images=images, timeout=timeout, stream=False)
+
+    def _build_messages(
+        self,
+        msg: Union[str, list[dict[str, str]]],
+        system_msgs: Optional[list[str]] = None,
+        format_msgs: Optional[list[dict[str, str]]] = None,
+        images: Optional[Union[str, list[str]]] = None,
+    ) -> list[dict]:
         if system_msgs:
             message = self._system_msgs(system_msgs)
         else:
@@ -153,12 +238,7 @@ class BaseLLM(ABC):
             message.append(self._user_msg(msg, images=images))
         else:
             message.extend(msg)
-        if stream is None:
-            stream = self.config.stream
-        compressed_message = self.compress_messages(message, compress_type=self.config.compress_type)
-        rsp = await self.acompletion_text(compressed_message, stream=stream, timeout=self.get_timeout(timeout))
-        # rsp = await self.acompletion_text(message, stream=stream, timeout=self.get_timeout(timeout))
-        return rsp
+        return message
 
     def _extract_assistant_rsp(self, context):
         return "\n".join([i["content"] for i in context if i["role"] == "assistant"])
@@ -208,9 +288,10 @@ class BaseLLM(ABC):
         self, messages: list[dict], stream: bool = False, timeout: int = USE_CONFIG_TIMEOUT
     ) -> str:
         """Asynchronous version of completion. Return str. Support stream-print"""
-        if stream:
-            return await self._achat_completion_stream(messages, timeout=self.get_timeout(timeout))
-        resp = await self._achat_completion(messages, timeout=self.get_timeout(timeout))
+        async with self._rate_limit(messages):
+            if stream:
+                return await self._achat_completion_stream(messages, timeout=self.get_timeout(timeout))
+            resp = await self._achat_completion(messages, timeout=self.get_timeout(timeout))
         return self.get_choice_text(resp)
 
     def get_choice_text(self, rsp: dict) -> str:
@@ -38,6 +38,8 @@ import logging
 import openai
 from openai import version
 
+from ohm.provider.http_client_pool import get_shared_aiohttp_session
+
 logger = logging.getLogger("openai")
 
 TIMEOUT_SECS = 600
@@ -233,12 +235,14 @@ class APIRequestor:
         api_type=None,
         api_version=None,
         organization=None,
+        proxy=None,
     ):
         self.base_url = base_url or openai.base_url
         self.api_key = key or openai.api_key
         self.api_type = ApiType.from_str(api_type) if api_type else ApiType.from_str("openai")
         self.api_version = api_version or openai.api_version
         self.organization = organization or openai.organization
+        self.proxy = _aiohttp_proxies_arg(proxy)
 
     @overload
     def request(
@@ -346,7 +350,7 @@ class APIRequestor:
         request_id: Optional[str] = None,
         request_timeout: Optional[Union[float, Tuple[float, float]]] = None,
     ) -> Tuple[Union[OpenAIResponse, AsyncGenerator[OpenAIResponse, None]], bool, str]:
-        ctx = aiohttp_session()
+        ctx = aiohttp_session(self.base_url, self.api_key, self.proxy)
         session = await ctx.__aenter__()
         try:
             result = await self.arequest_raw(
@@ -371,6 +375,7 @@ class APIRequestor:
                     async for r in resp:
                         yield r
                 finally:
+                    result.release()
                     await ctx.__aexit__(None, None, None)
 
             return wrap_resp(), got_stream, self.api_key
@@ -545,6 +550,8 @@ class APIRequestor:
             "data": data,
             "timeout": timeout,
         }
+        if self.proxy:
+            request_kwargs["proxy"] = self.proxy
         try:
             result = await session.request(**request_kwargs)
             # log_info(
@@ -575,6 +582,8 @@ class APIRequestor:
 
 
 @asynccontextmanager
-async def aiohttp_session() -> AsyncIterator[aiohttp.ClientSession]:
-    async with aiohttp.ClientSession() as session:
-        yield session
+async def aiohttp_session(
+    base_url: Optional[str] = None, api_key: Optional[str] = None, proxy: Optional[str] = None
+) -> AsyncIterator[aiohttp.ClientSession]:
+    """Yield the pooled session shared by requestors of the same endpoint. It stays open for later requests."""
+    yield get_shared_aiohttp_session(base_url, api_key, proxy)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : http_client_pool.py
+@Desc    : Process-wide registry of pooled HTTP clients, so that LLM instances talking to the same endpoint share
+    keep-alive connections instead of paying a TCP/TLS handshake each.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from typing import Optional, Type
+
+import aiohttp
+import httpx
+
+from ohm.configs.llm_config import LLMConfig
+
+_HTTPX_CLIENTS: dict[tuple, httpx.AsyncClient] = {}
+_AIOHTTP_SESSIONS: dict[tuple, aiohttp.ClientSession] = {}
+
+
+def http2_available() -> bool:
+    """httpx only speaks HTTP/2 when the optional `h2` package is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_shared_httpx_client(
+    config: LLMConfig, client_cls: Type[httpx.AsyncClient] = httpx.AsyncClient
+) -> httpx.AsyncClient:
+    """Return the httpx client shared by every LLM configured with the same (base_url, api_key, proxy).
+
+    `client_cls` lets SDKs that require their own httpx wrapper (openai, volcengine ark) keep a separate pool of
+    the right type. Pool limits are taken from the config that first creates the client. Like aiohttp sessions, httpx
+    clients hold connections bound to the event loop they were used in, so the running loop is part of the key. A client
+    requested outside a running loop cannot be tied to one and is not shared.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    key = (id(loop), client_cls, config.base_url, config.api_key, config.proxy or None)
+    client = _HTTPX_CLIENTS.get(key) if loop else None
+    if client is None or client.is_closed:
+        kwargs = {
+            "limits": httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            "http2": config.http2 and http2_available(),
+            "timeout": httpx.Timeout(config.timeout),
+        }
+        if config.proxy:
+            kwargs["proxies"] = config.proxy
+        if config.base_url:
+            kwargs["base_url"] = config.base_url
+        client = client_cls(**kwargs)
+        if loop:
+            _HTTPX_CLIENTS[key] = client
+    return client
+
+
+def get_shared_aiohttp_session(
+    base_url: Optional[str] = None, api_key: Optional[str] = None, proxy: Optional[str] = None, limit: int = 100
+) -> aiohttp.ClientSession:
+    """Return the aiohttp session shared by requestors of the same (base_url, api_key, proxy).
+
+    aiohttp sessions are bound to the event loop they were created in, so the running loop is part of the key.
+    """
+    loop = asyncio.get_running_loop()
+    key = (id(loop), base_url, api_key, proxy)
+    session = _AIOHTTP_SESSIONS.get(key)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=limit, keepalive_timeout=30)
+        session = aiohttp.ClientSession(connector=connector)
+        _AIOHTTP_SESSIONS[key] = session
+    return session
+
+
+async def close_shared_clients():
+    """Close every pooled client, e.g. before the process exits."""
+    for client in list(_HTTPX_CLIENTS.values()):
+        await client.aclose()
+    _HTTPX_CLIENTS.clear()
+    for session in list(_AIOHTTP_SESSIONS.values()):
+        await session.close()
+    _AIOHTTP_SESSIONS.clear()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_cache.py
+@Desc    : Content-addressed cache of LLM responses, with an in-memory LRU tier in front of an on-disk SQLite tier.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from ohm.configs.llm_cache_config import LLMCacheConfig
+from ohm.logs import logger
+
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def make_cache_key(model: str, temperature: float, messages: list[dict], tools: Optional[list[dict]] = None) -> str:
+    """Canonical sha256 of a request. Dict key order and whitespace do not affect the key."""
+    payload = {"model": model, "temperature": temperature, "messages": messages, "tools": tools or []}
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier response cache.
+
+    The memory tier is an LRU bounded by `memory_max_entries`. The disk tier is a SQLite table bounded by
+    `disk_max_entries` and `disk_max_bytes`; the least recently accessed rows are evicted first. Entries of both
+    tiers expire after `ttl` seconds.
+    """
+
+    def __init__(self, config: LLMCacheConfig):
+        self.config = config
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if config.persist_path:
+            self._init_disk(Path(config.persist_path))
+
+    def _init_disk(self, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)")
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache falls back to memory only, open {path} failed: {e}")
+            self._conn = None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.config.ttl) and now - created_at > self.config.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                created_at, value = item
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.stats.hits += 1
+                    self.stats.memory_hits += 1
+                    return value
+                self._memory.pop(key)
+
+            value = self._disk_get(key, now)
+            if value is None:
+                self.stats.misses += 1
+                return None
+            self._memory_put(key, value, now)
+            self.stats.hits += 1
+            self.stats.disk_hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+            self._disk_set(key, value, now)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn:
+                self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def _memory_put(self, key: str, value: Any, now: float):
+        self._memory[key] = (now, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.memory_max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Any]:
+        if not self._conn:
+            return None
+        try:
+            row = self._conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._expired(created_at, now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(value)
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    def _disk_set(self, key: str, value: Any, now: float):
+        if not self._conn:
+            return
+        try:
+            data = json.dumps(value, ensure_ascii=False)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            self._evict_disk(now)
+        except (sqlite3.Error, TypeError) as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _evict_disk(self, now: float):
+        if self.config.ttl:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.config.ttl,))
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.config.disk_max_entries and size <= self.config.disk_max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        victims = []
+        for victim, victim_size in rows:
+            if count <= self.config.disk_max_entries and size <= self.config.disk_max_bytes:
+                break
+            victims.append((victim,))
+            count -= 1
+            size -= victim_size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.stats.evictions += len(victims)
+
+
+_CACHES: dict[str, LLMResponseCache] = {}
+
+
+def get_llm_cache(config: LLMCacheConfig) -> Optional[LLMResponseCache]:
+    """Return the cache shared by every LLM instance configured with the same persist path, None if disabled."""
+    if not config.enabled:
+        return None
+    key = str(Path(config.persist_path).resolve()) if config.persist_path else f"memory:{id(config)}"
+    if key not in _CACHES:
+        _CACHES[key] = LLMResponseCache(config)
+    return _CACHES[key]
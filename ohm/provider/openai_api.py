@@ -8,10 +8,12 @@
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import re
-from typing import Optional, Union
+from typing import AsyncIterator, Optional, Union
 
+import httpx
 from openai import APIConnectionError, AsyncOpenAI, AsyncStream
 from openai._base_client import AsyncHttpxClientWrapper
 from openai.types import CompletionUsage
@@ -29,6 +31,7 @@ from ohm.const import USE_CONFIG_TIMEOUT
 from ohm.logs import log_llm_stream, logger
 from ohm.provider.base_llm import BaseLLM
 from ohm.provider.constant import GENERAL_FUNCTION_SCHEMA
+from ohm.provider.http_client_pool import get_shared_httpx_client
 from ohm.provider.llm_provider_registry import register_provider
 from ohm.utils.common import CodeParser, decode_image, log_and_reraise
 from ohm.utils.cost_manager import CostManager
@@ -57,6 +60,8 @@ from ohm.utils.token_counter import (
 class OpenAILLM(BaseLLM):
     """Check https://platform.openai.com/examples for examples"""
 
+    http_client_cls = AsyncHttpxClientWrapper
+
     def __init__(self, config: LLMConfig):
         self.config = config
         self._init_client()
@@ -67,66 +72,125 @@ class OpenAILLM(BaseLLM):
         """https://github.com/openai/openai-python#async-usage"""
         self.model = self.config.model  # Used in _calc_usage & _cons_kwargs
         self.pricing_plan = self.config.pricing_plan or self.model
-        kwargs = self._make_client_kwargs()
-        self.aclient = AsyncOpenAI(**kwargs)
-
-    def _make_client_kwargs(self) -> dict:
-        kwargs = {"api_key": self.config.api_key, "base_url": self.config.base_url}
+        self._aclient = None
+        self._http_client = None
 
-        # to use proxy, openai v1 needs http_client
-        if proxy_params := self._get_proxy_params():
-            kwargs["http_client"] = AsyncHttpxClientWrapper(**proxy_params)
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """The SDK client, on the httpx client pooled for the running event loop.
 
-        return kwargs
+        It is resolved at request time rather than in `__init__`, as LLM instances are mostly built before the event
+        loop starts, when no pooled client can be picked. It is rebuilt when the pooled client changes with the loop.
+        """
+        if self._aclient is not None and self._http_client is None:
+            return self._aclient  # assigned from outside
+        http_client = self._get_http_client()
+        if http_client is not self._http_client:
+            self._aclient = self._make_client(http_client)
+            self._http_client = http_client
+        return self._aclient
+
+    @aclient.setter
+    def aclient(self, value):
+        self._aclient = value
+        self._http_client = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self._http_client is not None:  # outside a loop nothing is shared, keep the client at hand
+                return self._http_client
+        # share pooled keep-alive connections (and the proxy, which openai v1 only accepts via http_client)
+        return get_shared_httpx_client(self.config, self.http_client_cls)
 
-    def _get_proxy_params(self) -> dict:
-        params = {}
-        if self.config.proxy:
-            params = {"proxies": self.config.proxy}
-            if self.config.base_url:
-                params["base_url"] = self.config.base_url
+    def _make_client(self, http_client: httpx.AsyncClient) -> AsyncOpenAI:
+        return AsyncOpenAI(**self._make_client_kwargs(), http_client=http_client)
 
-        return params
+    def _make_client_kwargs(self) -> dict:
+        return {"api_key": self.config.api_key, "base_url": self.config.base_url}
 
     async def _achat_completion_stream(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> str:
+        collected_messages = []
+        async for chunk_message in self._achat_completion_stream_iter(messages, timeout=timeout):
+            collected_messages.append(chunk_message)
+        return "".join(collected_messages)
+
+    async def _achat_completion_stream_iter(
+        self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT
+    ) -> AsyncIterator[str]:
+        """Yield the deltas of a streaming completion, and update costs once it finishes."""
         response: AsyncStream[ChatCompletionChunk] = await self.aclient.chat.completions.create(
             **self._cons_kwargs(messages, timeout=self.get_timeout(timeout)), stream=True
         )
         usage = None
         collected_messages = []
         has_finished = False
-        async for chunk in response:
-            chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
-            finish_reason = (
-                chunk.choices[0].finish_reason if chunk.choices and hasattr(chunk.choices[0], "finish_reason") else None
-            )
-            log_llm_stream(chunk_message)
-            collected_messages.append(chunk_message)
-            chunk_has_usage = hasattr(chunk, "usage") and chunk.usage
-            if has_finished:
-                # for oneapi, there has a usage chunk after finish_reason not none chunk
-                if chunk_has_usage:
-                    usage = CompletionUsage(**chunk.usage) if isinstance(chunk.usage, dict) else chunk.usage
-            if finish_reason:
-                if chunk_has_usage:
-                    # Some services have usage as an attribute of the chunk, such as Fireworks
-                    if isinstance(chunk.usage, CompletionUsage):
-                        usage = chunk.usage
-                    else:
-                        usage = CompletionUsage(**chunk.usage)
-                elif hasattr(chunk.choices[0], "usage"):
-                    # The usage of some services is an attribute of chunk.choices[0], such as Moonshot
-                    usage = CompletionUsage(**chunk.choices[0].usage)
-                has_finished = True
-
-        log_llm_stream("\n")
-        full_reply_content = "".join(collected_messages)
-        if not usage:
-            # Some services do not provide the usage attribute, such as OpenAI or OpenLLM
-            usage = self._calc_usage(messages, full_reply_content)
-
-        self._update_costs(usage)
-        return full_reply_content
+        try:
+            async for chunk in response:
+                chunk_message = chunk.choices[0].delta.content or "" if chunk.choices else ""  # extract the message
+                finish_reason = (
+                    chunk.choices[0].finish_reason
+                    if chunk.choices and hasattr(chunk.choices[0], "finish_reason")
+                    else None
+                )
+                log_llm_stream(chunk_message)
+                collected_messages.append(chunk_message)
+                if chunk_message:
+                    yield chunk_message
+                chunk_has_usage = hasattr(chunk, "usage") and chunk.usage
+                if has_finished:
+                    # for oneapi, there has a usage chunk after finish_reason not none chunk
+                    if chunk_has_usage:
+                        usage = CompletionUsage(**chunk.usage) if isinstance(chunk.usage, dict) else chunk.usage
+                if finish_reason:
+                    if chunk_has_usage:
+                        # Some services have usage as an attribute of the chunk, such as Fireworks
+                        if isinstance(chunk.usage, CompletionUsage):
+                            usage = chunk.usage
+                        else:
+                            usage = CompletionUsage(**chunk.usage)
+                    elif hasattr(chunk.choices[0], "usage"):
+                        # The usage of some services is an attribute of chunk.choices[0], such as Moonshot
+                        usage = CompletionUsage(**chunk.choices[0].usage)
+                    has_finished = True
+        finally:
+            # reached on normal completion as well as when the consumer stops early, which aborts the request
+            await response.close()
+            log_llm_stream("\n")
+            full_reply_content = "".join(collected_messages)
+            if not usage:
+                # Some services do not provide the usage attribute, such as OpenAI or OpenLLM
+                usage = self._calc_usage(messages, full_reply_content)
+            self._update_costs(usage)
+
+    async def aask_stream(
+        self,
+        msg: Union[str, list[dict[str, str]]],
+        system_msgs: Optional[list[str]] = None,
+        format_msgs: Optional[list[dict[str, str]]] = None,
+        images: Optional[Union[str, list[str]]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+    ) -> AsyncIterator[str]:
+        message = self._build_messages(msg, system_msgs, format_msgs, images)
+        compressed_message = self.compress_messages(message, compress_type=self.config.compress_type)
+        cache_key = self._cache_key(compressed_message)
+        if (rsp := self._get_cached_response(cache_key)) is not None:
+            yield rsp
+            return
+
+        collected_messages = []
+        async with self._rate_limit(compressed_message):
+            stream = self._achat_completion_stream_iter(compressed_message, timeout=timeout)
+            try:
+                async for chunk_message in stream:
+                    collected_messages.append(chunk_message)
+                    yield chunk_message
+            finally:
+                # leaving the loop early does not close the inner generator, close it now to abort the request
+                await stream.aclose()
+        if cache_key and collected_messages:
+            self.response_cache.set(cache_key, "".join(collected_messages))
 
     def _cons_kwargs(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT, **extra_kwargs) -> dict:
         kwargs = {
@@ -164,10 +228,11 @@ class OpenAILLM(BaseLLM):
     )
     async def acompletion_text(self, messages: list[dict], stream=False, timeout=USE_CONFIG_TIMEOUT) -> str:
         """when streaming, print each token in place."""
-        if stream:
-            return await self._achat_completion_stream(messages, timeout=timeout)
+        async with self._rate_limit(messages):
+            if stream:
+                return await self._achat_completion_stream(messages, timeout=timeout)
 
-        rsp = await self._achat_completion(messages, timeout=self.get_timeout(timeout))
+            rsp = await self._achat_completion(messages, timeout=self.get_timeout(timeout))
         return self.get_choice_text(rsp)
 
     async def _achat_completion_function(
@@ -175,7 +240,8 @@ class OpenAILLM(BaseLLM):
     ) -> ChatCompletion:
         messages = self.format_msg(messages)
         kwargs = self._cons_kwargs(messages=messages, timeout=self.get_timeout(timeout), **chat_configs)
-        rsp: ChatCompletion = await self.aclient.chat.completions.create(**kwargs)
+        async with self._rate_limit(messages):
+            rsp: ChatCompletion = await self.aclient.chat.completions.create(**kwargs)
         self._update_costs(rsp.usage)
         return rsp
 
@@ -192,8 +258,14 @@ class OpenAILLM(BaseLLM):
         if "tools" not in kwargs:
             configs = {"tools": [{"type": "function", "function": GENERAL_FUNCTION_SCHEMA}]}
             kwargs.update(configs)
+        cache_key = self._cache_key(self.format_msg(messages), tools=kwargs["tools"])
+        if (code := self._get_cached_response(cache_key)) is not None:
+            return code
         rsp = await self._achat_completion_function(messages, **kwargs)
-        return self.get_choice_function_arguments(rsp)
+        code = self.get_choice_function_arguments(rsp)
+        if cache_key:
+            self.response_cache.set(cache_key, code)
+        return code
 
     def _parse_arguments(self, arguments: str) -> dict:
         """parse arguments in openai function call"""
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : rate_limiter.py
+@Desc    : Per-(provider, model) concurrency and token-bucket rate limiting for LLM requests.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from ohm.configs.llm_config import LLMConfig
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`, holding at most one minute's worth.
+
+    Waiters are served in arrival order: the lock is FIFO, and the holder sleeps until its whole amount is
+    available, so a large request is never starved by a stream of small ones.
+    """
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self._rate = self.capacity / 60
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self._rate)
+                self._refill()
+            self.tokens -= amount
+
+
+class LLMRateLimiter:
+    def __init__(self, max_concurrency: int = 0, rpm: int = 0, tpm: int = 0):
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._requests = TokenBucket(rpm) if rpm else None
+        self._tokens = TokenBucket(tpm) if tpm else None
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Wait for a request slot, then hold it for the duration of the request."""
+        if self._requests:
+            await self._requests.acquire(1)
+        if self._tokens and tokens:
+            await self._tokens.acquire(tokens)
+        if not self._semaphore:
+            yield
+            return
+        async with self._semaphore:
+            yield
+
+
+_LIMITERS: dict[tuple, LLMRateLimiter] = {}
+
+
+def get_rate_limiter(config: LLMConfig, model: Optional[str] = None) -> Optional[LLMRateLimiter]:
+    """Return the limiter shared by all LLM instances of the same provider and model, None if unlimited.
+
+    asyncio primitives are bound to one event loop, so limiters are also keyed by the running loop.
+    """
+    if not (config.max_concurrency or config.rpm or config.tpm):
+        return None
+    key = (id(asyncio.get_running_loop()), config.api_type, config.base_url, model or config.model)
+    if key not in _LIMITERS:
+        _LIMITERS[key] = LLMRateLimiter(config.max_concurrency, config.rpm, config.tpm)
+    return _LIMITERS[key]
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : embedding_cache.py
+@Desc    : Cache of text embeddings, with an in-memory LRU tier in front of memory-mapped float32 segment files.
+
+    A store directory holds the embeddings of one (api type, model, dimensions), in segment files named
+    `embeddings_{dim}_{time_ns}_{pid}.bin`. Each process appends to its own segment, so concurrent writers never
+    interleave. A segment is a sequence of fixed-size records: the 32-byte sha256 digest of the text followed by the
+    float32 embedding. A row is only served if it still holds the digest it was indexed under.
+
+    When a store is opened with more than `max_segments` segments, those of exited processes are merged into one,
+    under a lock file, as a live process may still append to its own.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+from llama_index.core.base.embeddings.base import Embedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+
+from ohm.configs.embedding_cache_config import EmbeddingCacheConfig
+from ohm.logs import logger
+from ohm.utils.file_lock import file_lock, is_process_alive
+
+SEGMENT_GLOB = "embeddings_*.bin"
+LOCK_FILENAME = ".lock"
+KEY_SIZE = 32
+MAX_EMBED_BATCH_SIZE = 2048  # the largest batch BaseEmbedding accepts, misses are re-batched by the wrapped model
+
+
+class EmbeddingStore:
+    """Embeddings of one model, keyed by the sha256 of the text."""
+
+    def __init__(self, directory: str | Path, memory_max_entries: int = 10000, max_segments: int = 8):
+        self.directory = Path(directory)
+        self.memory_max_entries = memory_max_entries
+        self.dim: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[bytes, list[float]] = OrderedDict()
+        self._index: dict[bytes, tuple[int, int]] = {}  # digest -> (segment, row)
+        self._segments: list[Path] = []
+        self._maps: list[Optional[np.memmap]] = []
+        self._segment: Optional[int] = None  # the segment this process appends to
+        self._lock = threading.Lock()
+        self._load(max_segments)
+
+    @staticmethod
+    def hash_text(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[list[float]]]:
+        """Return the cached embedding of each text, None for a miss."""
+        with self._lock:
+            embeddings = [self._get(self.hash_text(text)) for text in texts]
+        hits = sum(1 for e in embeddings if e is not None)
+        self.hits += hits
+        self.misses += len(texts) - hits
+        return embeddings
+
+    def put_many(self, texts: List[str], embeddings: List[Embedding]) -> List[list[float]]:
+        """Cache the embeddings, returned as rounded to float32 like the cached ones."""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        rows = vectors.tolist()
+        with self._lock:
+            digests = [self.hash_text(text) for text in texts]
+            for digest, row in zip(digests, rows):
+                self._memory_put(digest, row)
+            self._append([d for d in digests if d not in self._index], vectors, digests)
+        return rows
+
+    def _get(self, digest: bytes) -> Optional[list[float]]:
+        row = self._memory.get(digest)
+        if row is not None:
+            self._memory.move_to_end(digest)
+            return row
+        location = self._index.get(digest)
+        if location is None:
+            return None
+        row = self._read(*location, digest=digest)
+        if row is None:
+            del self._index[digest]
+            return None
+        self._memory_put(digest, row)
+        return row
+
+    def _memory_put(self, digest: bytes, row: list[float]):
+        self._memory[digest] = row
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    def _record_dtype(self, dim: int) -> np.dtype:
+        return np.dtype([("key", "u1", (KEY_SIZE,)), ("vec", "<f4", (dim,))])
+
+    def _open_map(self, path: Path) -> Optional[np.memmap]:
+        dtype = self._record_dtype(self.dim)
+        count = path.stat().st_size // dtype.itemsize  # a torn last record is ignored
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,)) if count else None
+
+    def _read(self, segment: int, row: int, digest: Optional[bytes] = None) -> Optional[list[float]]:
+        """Return the embedding at the row, None if the row does not hold `digest` (any more)."""
+        mm = self._maps[segment]
+        if mm is None or row >= len(mm):
+            # the segment grew since it was mapped
+            try:
+                mm = self._maps[segment] = self._open_map(self._segments[segment])
+            except FileNotFoundError:
+                return None
+        if mm is None or row >= len(mm):
+            return None
+        record = mm[row]
+        if digest is not None and record["key"].tobytes() != digest:
+            return None
+        return record["vec"].tolist()
+
+    def _load(self, max_segments: int):
+        # embeddings_{dim}_{time_ns}_{pid}, oldest first, so newer records of a text win
+        segments = sorted(self.directory.glob(SEGMENT_GLOB), key=lambda p: int(p.stem.split("_")[2]))
+        if not segments:
+            return
+        dims = {int(p.stem.split("_")[1]) for p in segments}
+        self.dim = int(segments[-1].stem.split("_")[1])
+        if len(dims) > 1:
+            logger.warning(f"Embeddings of different dimensions in {self.directory}, only those of {self.dim} are used.")
+        segments = [p for p in segments if int(p.stem.split("_")[1]) == self.dim]
+        for path in segments:
+            self._add_segment(path)
+        if len(segments) > max_segments:
+            with file_lock(self.directory / LOCK_FILENAME):
+                self._merge()
+
+    def _add_segment(self, path: Path):
+        try:
+            mm = self._open_map(path)
+        except FileNotFoundError:
+            # merged away by another process since it was listed, a miss at worst
+            return
+        segment = len(self._segments)
+        self._segments.append(path)
+        self._maps.append(mm)
+        if mm is not None:
+            keys = np.ascontiguousarray(mm["key"]).tobytes()
+            for row in range(len(mm)):
+                self._index[keys[row * KEY_SIZE : (row + 1) * KEY_SIZE]] = (segment, row)
+
+    def _merge(self):
+        """Rewrite the segments of exited processes into one, keeping the newest embedding of each text.
+
+        The segment of a live process is left alone, as it may still append to it.
+        """
+        merged = {
+            i for i, path in enumerate(self._segments) if path.exists() and not is_process_alive(_segment_pid(path))
+        }
+        if len(merged) < 2:
+            return
+        digests = [d for d, (segment, _) in self._index.items() if segment in merged]
+        rows = [self._read(*self._index[d], digest=d) for d in digests]
+        digests = [d for d, row in zip(digests, rows) if row is not None]
+        for d in digests:
+            del self._index[d]
+        if digests:
+            vectors = np.array([row for row in rows if row is not None], dtype=np.float32)
+            self._append(digests, vectors, digests)
+        for i in merged:
+            self._segments[i].unlink(missing_ok=True)
+            self._maps[i] = None
+        logger.info(f"Merged {len(merged)} embedding segments of {self.directory}.")
+
+    def _append(self, new_digests: list[bytes], vectors: np.ndarray, digests: list[bytes]):
+        if not new_digests:
+            return
+        dim = vectors.shape[1]
+        if self.dim is None:
+            self.dim = dim
+        if dim != self.dim:
+            logger.warning(f"Embedding dimension {dim} differs from {self.dim} of {self.directory}, not persisted.")
+            return
+
+        # one record per new text, a text repeated in the batch is written once
+        positions = {d: i for i, d in enumerate(digests)}
+        unique = list(dict.fromkeys(new_digests))
+        records = np.empty(len(unique), dtype=self._record_dtype(dim))
+        records["key"] = np.frombuffer(b"".join(unique), dtype=np.uint8).reshape(-1, KEY_SIZE)
+        records["vec"] = vectors[[positions[d] for d in unique]]
+
+        if self._segment is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._segment = len(self._segments)
+            self._segments.append(self.directory / f"embeddings_{dim}_{time.time_ns()}_{os.getpid()}.bin")
+            self._maps.append(None)
+        try:
+            with open(self._segments[self._segment], "ab") as f:
+                start = f.tell() // records.dtype.itemsize
+                f.write(records.tobytes())
+        except OSError as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+            return
+        for row, digest in enumerate(unique, start=start):
+            self._index[digest] = (self._segment, row)
+
+
+def _segment_pid(path: Path) -> int:
+    return int(path.stem.split("_")[3])
+
+
+class CachedEmbedding(BaseEmbedding):
+    """Embedding model wrapper that serves text embeddings from an EmbeddingStore and embeds only the misses.
+
+    Query embeddings are passed through, some models embed queries differently from documents.
+    """
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _store: EmbeddingStore = PrivateAttr()
+
+    def __init__(self, embed_model: BaseEmbedding, store: EmbeddingStore, **kwargs: Any):
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=MAX_EMBED_BATCH_SIZE,
+            callback_manager=embed_model.callback_manager,
+            **kwargs,
+        )
+        self._embed_model = embed_model
+        self._store = store
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def store(self) -> EmbeddingStore:
+        return self._store
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._embed_model.get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await self._embed_model.aget_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        embeddings = self._store.get_many(texts)
+        misses = self._misses(texts, embeddings)
+        if misses:
+            self._fill(texts, embeddings, misses, self._embed_model.get_text_embedding_batch(misses))
+        return embeddings
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        embeddings = self._store.get_many(texts)
+        misses = self._misses(texts, embeddings)
+        if misses:
+            self._fill(texts, embeddings, misses, await self._embed_model.aget_text_embedding_batch(misses))
+        return embeddings
+
+    @staticmethod
+    def _misses(texts: List[str], embeddings: List[Optional[Embedding]]) -> List[str]:
+        return list(dict.fromkeys(text for text, e in zip(texts, embeddings) if e is None))
+
+    def _fill(self, texts: List[str], embeddings: List[Optional[Embedding]], misses: List[str], new: List[Embedding]):
+        computed = dict(zip(misses, self._store.put_many(misses, new)))
+        for i, text in enumerate(texts):
+            if embeddings[i] is None:
+                embeddings[i] = computed[text]
+
+
+_STORES: dict[str, EmbeddingStore] = {}
+
+
+def get_embedding_store(config: EmbeddingCacheConfig, namespace: list[Any]) -> Optional[EmbeddingStore]:
+    """Return the store shared by every embedding model of the same namespace, None if disabled.
+
+    The namespace, such as the api type, model and dimensions, selects the subdirectory, so embeddings of different
+    models never mix.
+    """
+    if not config.enabled:
+        return None
+    name = hashlib.sha256(json.dumps(namespace, default=str).encode("utf-8")).hexdigest()[:16]
+    directory = Path(config.persist_path) / name
+    key = str(directory.resolve())
+    if key not in _STORES:
+        _STORES[key] = EmbeddingStore(directory, config.memory_max_entries, config.max_segments)
+    return _STORES[key]
@@ -53,6 +53,7 @@ from ohm.rag.schema import (
     BaseRankerConfig,
     BaseRetrieverConfig,
     BM25RetrieverConfig,
+    HybridRetrieverConfig,
     ObjectNode,
     OmniParseOptions,
     OmniParseType,
@@ -97,6 +98,7 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        hybrid_config: HybridRetrieverConfig = None,
         fs: Optional[fsspec.AbstractFileSystem] = None,
     ) -> "SimpleEngine":
         """From docs.
@@ -111,6 +113,7 @@ class SimpleEngine(RetrieverQueryEngine):
             llm: Must supported by llama index. Default OpenAI.
             retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever.
             ranker_configs: Configuration for rankers.
+            hybrid_config: How SimpleHybridRetriever fuses the results of multiple retrievers.
             fs: File system to use.
         """
         if not input_dir and not input_files:
@@ -132,6 +135,7 @@ class SimpleEngine(RetrieverQueryEngine):
             llm=llm,
             retriever_configs=retriever_configs,
             ranker_configs=ranker_configs,
+            hybrid_config=hybrid_config,
         )
 
     @classmethod
@@ -143,6 +147,7 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        hybrid_config: HybridRetrieverConfig = None,
     ) -> "SimpleEngine":
         """From objs.
 
@@ -153,6 +158,7 @@ class SimpleEngine(RetrieverQueryEngine):
             llm: Must supported by llama index. Default OpenAI.
             retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever.
             ranker_configs: Configuration for rankers.
+            hybrid_config: How SimpleHybridRetriever fuses the results of multiple retrievers.
         """
         objs = objs or []
         retriever_configs = retriever_configs or []
@@ -169,6 +175,7 @@ class SimpleEngine(RetrieverQueryEngine):
             llm=llm,
             retriever_configs=retriever_configs,
             ranker_configs=ranker_configs,
+            hybrid_config=hybrid_config,
         )
 
     @classmethod
@@ -179,10 +186,17 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        hybrid_config: HybridRetrieverConfig = None,
     ) -> "SimpleEngine":
         """Load from previously maintained index by self.persist(), index_config contains persis_path."""
         index = get_index(index_config, embed_model=cls._resolve_embed_model(embed_model, [index_config]))
-        return cls._from_index(index, llm=llm, retriever_configs=retriever_configs, ranker_configs=ranker_configs)
+        return cls._from_index(
+            index,
+            llm=llm,
+            retriever_configs=retriever_configs,
+            ranker_configs=ranker_configs,
+            hybrid_config=hybrid_config,
+        )
 
     async def asearch(self, content: str, **kwargs) -> str:
         """Inplement tools.SearchInterface"""
@@ -271,11 +285,14 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        hybrid_config: HybridRetrieverConfig = None,
     ) -> "SimpleEngine":
         embed_model = cls._resolve_embed_model(embed_model, retriever_configs)
         llm = llm or get_rag_llm()
 
-        retriever = get_retriever(configs=retriever_configs, nodes=nodes, embed_model=embed_model)
+        retriever = get_retriever(
+            configs=retriever_configs, hybrid_config=hybrid_config, nodes=nodes, embed_model=embed_model
+        )
         rankers = get_rankers(configs=ranker_configs, llm=llm)  # Default []
 
         return cls(
@@ -294,11 +311,14 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        hybrid_config: HybridRetrieverConfig = None,
     ) -> "SimpleEngine":
         embed_model = cls._resolve_embed_model(embed_model, retriever_configs)
         llm = llm or get_rag_llm()
 
-        retriever = get_retriever(configs=retriever_configs, nodes=nodes, embed_model=embed_model)
+        retriever = get_retriever(
+            configs=retriever_configs, hybrid_config=hybrid_config, nodes=nodes, embed_model=embed_model
+        )
         rankers = get_rankers(configs=ranker_configs, llm=llm)  # Default []
 
         return cls(
@@ -315,10 +335,13 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        hybrid_config: HybridRetrieverConfig = None,
     ) -> "SimpleEngine":
         llm = llm or get_rag_llm()
 
-        retriever = get_retriever(configs=retriever_configs, index=index)  # Default index.as_retriever
+        retriever = get_retriever(
+            configs=retriever_configs, hybrid_config=hybrid_config, index=index
+        )  # Default index.as_retriever
         rankers = get_rankers(configs=ranker_configs, llm=llm)  # Default []
 
         return cls(
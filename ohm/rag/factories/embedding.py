@@ -12,6 +12,7 @@ from llama_index.embeddings.openai import OpenAIEmbedding
 from ohm.config2 import Config
 from ohm.configs.embedding_config import EmbeddingType
 from ohm.configs.llm_config import LLMType
+from ohm.rag.embedding_cache import CachedEmbedding, get_embedding_store
 from ohm.rag.factories.base import GenericFactory
 
 
@@ -32,8 +33,15 @@ class RAGEmbeddingFactory(GenericFactory):
         self.config = config if config else Config.default()
 
     def get_rag_embedding(self, key: EmbeddingType = None) -> BaseEmbedding:
-        """Key is EmbeddingType."""
-        return super().get_instance(key or self._resolve_embedding_type())
+        """Key is EmbeddingType.
+
+        When the embedding cache is enabled, the model is wrapped so that texts embedded before are not sent again.
+        """
+        key = key or self._resolve_embedding_type()
+        embed_model = super().get_instance(key)
+        namespace = [getattr(key, "value", key), embed_model.model_name, self.config.embedding.dimensions]
+        store = get_embedding_store(self.config.embedding.cache, namespace)
+        return CachedEmbedding(embed_model, store) if store else embed_model
 
     def _resolve_embedding_type(self) -> EmbeddingType | LLMType:
         """Resolves the embedding type.
@@ -30,6 +30,7 @@ from ohm.rag.schema import (
     ElasticsearchKeywordRetrieverConfig,
     ElasticsearchRetrieverConfig,
     FAISSRetrieverConfig,
+    HybridRetrieverConfig,
     MilvusRetrieverConfig,
 )
 
@@ -64,17 +65,29 @@ class RetrieverFactory(ConfigBasedFactory):
         }
         super().__init__(creators)
 
-    def get_retriever(self, configs: list[BaseRetrieverConfig] = None, **kwargs) -> RAGRetriever:
+    def get_retriever(
+        self, configs: list[BaseRetrieverConfig] = None, hybrid_config: HybridRetrieverConfig = None, **kwargs
+    ) -> RAGRetriever:
         """Creates and returns a retriever instance based on the provided configurations.
 
-        If multiple retrievers, using SimpleHybridRetriever.
+        If multiple retrievers, using SimpleHybridRetriever, which fuses their results as `hybrid_config` specifies.
         """
         if not configs:
             return self._create_default(**kwargs)
 
         retrievers = super().get_instances(configs, **kwargs)
-
-        return SimpleHybridRetriever(*retrievers) if len(retrievers) > 1 else retrievers[0]
+        if len(retrievers) == 1:
+            return retrievers[0]
+
+        hybrid_config = hybrid_config or HybridRetrieverConfig()
+        return SimpleHybridRetriever(
+            *retrievers,
+            fusion_mode=hybrid_config.fusion_mode,
+            rrf_k=hybrid_config.rrf_k,
+            similarity_top_k=hybrid_config.similarity_top_k or max(config.similarity_top_k for config in configs),
+            weights=[config.fusion_weight for config in configs],
+            timeouts=[config.timeout for config in configs],
+        )
 
     def _create_default(self, **kwargs) -> RAGRetriever:
         index = self._extract_index(None, **kwargs) or self._build_default_index(**kwargs)
@@ -1,13 +1,178 @@
 """BM25 retriever."""
+import copy
+from array import array
 from pathlib import Path
 from typing import Callable, Optional
 
+import numpy as np
 from llama_index.core import VectorStoreIndex
 from llama_index.core.callbacks.base import CallbackManager
 from llama_index.core.constants import DEFAULT_SIMILARITY_TOP_K
-from llama_index.core.schema import BaseNode, IndexNode
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, IndexNode, NodeWithScore, QueryBundle
 from llama_index.retrievers.bm25 import BM25Retriever
-from rank_bm25 import BM25Okapi
+from llama_index.retrievers.bm25.base import tokenize_remove_stopwords
+
+from ohm.logs import logger
+
+BM25_INDEX_FILENAME = "bm25_index.npz"
+
+
+class IncrementalBM25Okapi:
+    """Okapi BM25 over an inverted index that supports adding and deleting documents.
+
+    Scores are the same as `rank_bm25.BM25Okapi` built over the live documents, including its epsilon floor for
+    negative idf. Postings are appended in place, so adding a document only costs its own tokens; idf is
+    recomputed lazily, vectorized over the vocabulary, on the first query after a change.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.vocab: dict[str, int] = {}
+        self._post_docs: list[array] = []  # term id -> doc ids
+        self._post_tfs: list[array] = []  # term id -> term frequencies, aligned with _post_docs
+        self._df = array("l")  # term id -> number of live docs containing the term
+        self._doc_len = array("f")
+        self._alive = bytearray()
+        self._num_live = 0
+        self._total_len = 0.0
+        self._idf: Optional[np.ndarray] = None
+
+    @property
+    def num_docs(self) -> int:
+        """Number of doc ids handed out, deleted ones included."""
+        return len(self._doc_len)
+
+    @property
+    def num_live(self) -> int:
+        return self._num_live
+
+    def add(self, tokens: list[str]) -> int:
+        """Index a document and return its doc id."""
+        doc_id = len(self._doc_len)
+        for term, tf in self._count(tokens).items():
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                term_id = self.vocab[term] = len(self._post_docs)
+                self._post_docs.append(array("i"))
+                self._post_tfs.append(array("f"))
+                self._df.append(0)
+            self._post_docs[term_id].append(doc_id)
+            self._post_tfs[term_id].append(tf)
+            self._df[term_id] += 1
+        self._doc_len.append(len(tokens))
+        self._alive.append(1)
+        self._num_live += 1
+        self._total_len += len(tokens)
+        self._idf = None
+        return doc_id
+
+    def delete(self, doc_id: int, tokens: list[str]):
+        """Delete a document, given the tokens it was indexed with. Its postings are skipped until `compact`."""
+        if not self._alive[doc_id]:
+            return
+        for term in self._count(tokens):
+            if (term_id := self.vocab.get(term)) is not None:
+                self._df[term_id] -= 1
+        self._alive[doc_id] = 0
+        self._num_live -= 1
+        self._total_len -= self._doc_len[doc_id]
+        self._idf = None
+
+    def is_alive(self, doc_id: int) -> bool:
+        return bool(self._alive[doc_id])
+
+    def get_scores(self, query_tokens: list[str]) -> np.ndarray:
+        """Return the score of every doc id, -inf for deleted ones."""
+        scores = np.zeros(self.num_docs, dtype=np.float64)
+        if self._num_live:
+            idf = self._get_idf()
+            doc_len = np.frombuffer(self._doc_len, dtype=np.float32)
+            avgdl = self._total_len / self._num_live
+            for term in query_tokens:
+                term_id = self.vocab.get(term)
+                if term_id is None or not self._df[term_id]:
+                    continue
+                docs = np.frombuffer(self._post_docs[term_id], dtype=np.int32)
+                tfs = np.frombuffer(self._post_tfs[term_id], dtype=np.float32).astype(np.float64)
+                norm = self.k1 * (1 - self.b + self.b * doc_len[docs] / avgdl)
+                scores[docs] += idf[term_id] * (tfs * (self.k1 + 1) / (tfs + norm))
+        scores[np.frombuffer(self._alive, dtype=np.uint8) == 0] = -np.inf
+        return scores
+
+    def compact(self) -> list[int]:
+        """Drop deleted documents and renumber the live ones. Return the old doc id of each new doc id."""
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        kept = np.flatnonzero(alive)
+        if len(kept) == self.num_docs:
+            return kept.tolist()
+        new_ids = np.full(self.num_docs, -1, dtype=np.int32)
+        new_ids[kept] = np.arange(len(kept), dtype=np.int32)
+        for term_id in range(len(self._post_docs)):
+            docs = np.frombuffer(self._post_docs[term_id], dtype=np.int32)
+            tfs = np.frombuffer(self._post_tfs[term_id], dtype=np.float32)
+            mask = alive[docs]
+            self._post_docs[term_id] = array("i", new_ids[docs[mask]].tobytes())
+            self._post_tfs[term_id] = array("f", tfs[mask].tobytes())
+        self._doc_len = array("f", np.frombuffer(self._doc_len, dtype=np.float32)[kept].tobytes())
+        self._alive = bytearray(b"\x01" * len(kept))
+        self._idf = None
+        return kept.tolist()
+
+    def save(self, path: Path, **extra: np.ndarray):
+        """Save the index as flat arrays, with `extra` arrays stored alongside."""
+        self.compact()
+        lengths = np.array([len(i) for i in self._post_docs], dtype=np.int64)
+        np.savez(
+            path,
+            terms=np.array(list(self.vocab), dtype=str),
+            post_offsets=np.concatenate([[0], np.cumsum(lengths)]),
+            post_docs=np.concatenate([np.frombuffer(i, dtype=np.int32) for i in self._post_docs] or [[]]),
+            post_tfs=np.concatenate([np.frombuffer(i, dtype=np.float32) for i in self._post_tfs] or [[]]),
+            df=np.array(self._df, dtype=np.int64),
+            doc_len=np.frombuffer(self._doc_len, dtype=np.float32),
+            params=np.array([self.k1, self.b, self.epsilon]),
+            **extra,
+        )
+
+    @classmethod
+    def load(cls, data: "np.lib.npyio.NpzFile") -> "IncrementalBM25Okapi":
+        k1, b, epsilon = data["params"].tolist()
+        bm25 = cls(k1=k1, b=b, epsilon=epsilon)
+        bm25.vocab = {term: idx for idx, term in enumerate(data["terms"].tolist())}
+        offsets = data["post_offsets"]
+        post_docs = data["post_docs"].astype(np.int32)
+        post_tfs = data["post_tfs"].astype(np.float32)
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            bm25._post_docs.append(array("i", post_docs[start:end].tobytes()))
+            bm25._post_tfs.append(array("f", post_tfs[start:end].tobytes()))
+        bm25._df = array("l", data["df"].tolist())
+        bm25._doc_len = array("f", data["doc_len"].astype(np.float32).tobytes())
+        bm25._alive = bytearray(b"\x01" * len(bm25._doc_len))
+        bm25._num_live = len(bm25._doc_len)
+        bm25._total_len = float(data["doc_len"].sum())
+        return bm25
+
+    def _get_idf(self) -> np.ndarray:
+        if self._idf is None:
+            df = np.array(self._df, dtype=np.float64)
+            present = df > 0
+            idf = np.log(self._num_live - df + 0.5) - np.log(df + 0.5)
+            if present.any():
+                eps = self.epsilon * idf[present].mean()
+                idf[present & (idf < 0)] = eps
+            self._idf = idf
+        return self._idf
+
+    @staticmethod
+    def _count(tokens: list[str]) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        return counts
 
 
 class DynamicBM25Retriever(BM25Retriever):
@@ -23,34 +188,62 @@ class DynamicBM25Retriever(BM25Retriever):
         object_map: Optional[dict] = None,
         verbose: bool = False,
         index: VectorStoreIndex = None,
+        persist_path: Optional[str] = None,
     ) -> None:
-        super().__init__(
-            nodes=nodes,
-            tokenizer=tokenizer,
-            similarity_top_k=similarity_top_k,
-            callback_manager=callback_manager,
-            object_map=object_map,
-            objects=objects,
-            verbose=verbose,
+        # Skip BM25Retriever.__init__, which tokenizes the whole corpus into a BM25Okapi we don't use.
+        BaseRetriever.__init__(
+            self, callback_manager=callback_manager, object_map=object_map, objects=objects, verbose=verbose
         )
+        self._tokenizer = tokenizer or tokenize_remove_stopwords
+        self._similarity_top_k = similarity_top_k
         self._index = index
 
+        self._nodes: list[BaseNode] = []
+        self._doc_nodes: list[Optional[BaseNode]] = []  # doc id -> node, None once deleted
+        self._doc_ids: dict[str, int] = {}  # node id -> doc id
+        self.bm25 = self._load_bm25(persist_path, nodes) if persist_path else None
+        if self.bm25 is None:
+            self.bm25 = IncrementalBM25Okapi()
+            self._add_to_bm25(nodes)
+
     def add_nodes(self, nodes: list[BaseNode], **kwargs) -> None:
         """Support add nodes."""
 
-        self._nodes.extend(nodes)
-        self._corpus = [self._tokenizer(node.get_content()) for node in self._nodes]
-        self.bm25 = BM25Okapi(self._corpus)
+        self._add_to_bm25(nodes)
 
         if self._index:
             self._index.insert_nodes(nodes, **kwargs)
 
+    def delete_nodes(self, node_ids: list[str], **kwargs) -> None:
+        """Support deleting nodes by id."""
+
+        for node_id in node_ids:
+            doc_id = self._doc_ids.pop(node_id, None)
+            if doc_id is None:
+                continue
+            node = self._doc_nodes[doc_id]
+            self.bm25.delete(doc_id, self._tokenizer(node.get_content()))
+            self._doc_nodes[doc_id] = None
+        self._nodes = [node for node in self._doc_nodes if node is not None]
+
+        if self._index:
+            self._index.delete_nodes(node_ids, **kwargs)
+
     def persist(self, persist_dir: str, **kwargs) -> None:
         """Support persist."""
 
         if self._index:
             self._index.storage_context.persist(persist_dir)
 
+        kept = self.bm25.compact()
+        self._doc_nodes = [self._doc_nodes[i] for i in kept]
+        self._doc_ids = {node.node_id: doc_id for doc_id, node in enumerate(self._doc_nodes)}
+        Path(persist_dir).mkdir(parents=True, exist_ok=True)
+        self.bm25.save(
+            Path(persist_dir) / BM25_INDEX_FILENAME,
+            node_ids=np.array([node.node_id for node in self._doc_nodes], dtype=str),
+        )
+
     def query_total_count(self) -> int:
         """Support query total count."""
 
@@ -61,6 +254,42 @@ class DynamicBM25Retriever(BM25Retriever):
 
         self._delete_json_files(kwargs.get("persist_dir"))
         self._nodes = []
+        self._doc_nodes = []
+        self._doc_ids = {}
+        self.bm25 = IncrementalBM25Okapi()
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        scores = self.bm25.get_scores(self._tokenizer(query_bundle.query_str))
+        top_k = min(self._similarity_top_k, self.bm25.num_live)
+        # stable sort keeps the insertion order among equal scores, like sorting all scored nodes did
+        doc_ids = np.argsort(-scores, kind="stable")[:top_k]
+        return [NodeWithScore(node=copy.deepcopy(self._doc_nodes[i]), score=float(scores[i])) for i in doc_ids]
+
+    def _add_to_bm25(self, nodes: list[BaseNode]):
+        for node in nodes:
+            doc_id = self.bm25.add(self._tokenizer(node.get_content()))
+            self._doc_nodes.append(node)
+            self._doc_ids[node.node_id] = doc_id
+            self._nodes.append(node)
+
+    def _load_bm25(self, persist_path: str, nodes: list[BaseNode]) -> Optional[IncrementalBM25Okapi]:
+        """Load the persisted index if it was built from exactly these nodes, to avoid re-tokenizing them."""
+        path = Path(persist_path) / BM25_INDEX_FILENAME
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                if data["node_ids"].tolist() != [node.node_id for node in nodes]:
+                    logger.info(f"BM25 index at {path} is stale, rebuild it.")
+                    return None
+                bm25 = IncrementalBM25Okapi.load(data)
+        except Exception as e:
+            logger.warning(f"Load BM25 index from {path} failed, rebuild it: {e}")
+            return None
+        self._nodes = list(nodes)
+        self._doc_nodes = list(nodes)
+        self._doc_ids = {node.node_id: doc_id for doc_id, node in enumerate(nodes)}
+        return bm25
 
     @staticmethod
     def _delete_json_files(directory: str):
@@ -71,3 +300,4 @@ class DynamicBM25Retriever(BM25Retriever):
 
         for file in Path(directory).glob("*.json"):
             file.unlink()
+        (Path(directory) / BM25_INDEX_FILENAME).unlink(missing_ok=True)
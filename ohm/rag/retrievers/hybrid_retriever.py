@@ -1,41 +1,116 @@
 """Hybrid retriever."""
 
+import asyncio
 import copy
+from typing import Literal, Optional
 
-from llama_index.core.schema import BaseNode, QueryType
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryType
+from llama_index.core.vector_stores.types import BasePydanticVectorStore, VectorStore
 
+from ohm.logs import logger
 from ohm.rag.retrievers.base import RAGRetriever
 
 
 class SimpleHybridRetriever(RAGRetriever):
-    """A composite retriever that aggregates search results from multiple retrievers."""
+    """A composite retriever that queries multiple retrievers concurrently and fuses their results.
 
-    def __init__(self, *retrievers):
+    Args:
+        retrievers: The retrievers to query.
+        fusion_mode: `rrf` scores a node by the sum of `weight / (rrf_k + rank)` over the retrievers that returned it,
+            `weighted` by the sum of `weight * score`, with each retriever's scores min-max normalized to [0, 1].
+        rrf_k: Rank offset of reciprocal rank fusion.
+        similarity_top_k: Cap of the fused results, None for no cap.
+        weights: Weight of each retriever, defaults to 1.0 for all.
+        timeouts: Seconds to wait for each retriever, None for no timeout. A retriever that times out contributes nothing.
+
+    Retrievers without a native async path, whose `aretrieve` would run the synchronous search on the event loop, such
+    as BM25 or FAISS, are run in a worker thread, so that they overlap and their timeouts take effect.
+    """
+
+    def __init__(
+        self,
+        *retrievers,
+        fusion_mode: Literal["rrf", "weighted"] = "rrf",
+        rrf_k: int = 60,
+        similarity_top_k: Optional[int] = None,
+        weights: Optional[list[float]] = None,
+        timeouts: Optional[list[Optional[float]]] = None,
+    ):
         self.retrievers: list[RAGRetriever] = retrievers
+        self.fusion_mode = fusion_mode
+        self.rrf_k = rrf_k
+        self.similarity_top_k = similarity_top_k
+        self.weights = list(weights) if weights else [1.0] * len(retrievers)
+        self.timeouts = list(timeouts) if timeouts else [None] * len(retrievers)
         super().__init__()
 
     async def _aretrieve(self, query: QueryType, **kwargs):
-        """Asynchronously retrieves and aggregates search results from all configured retrievers.
+        """Asynchronously retrieves from all configured retrievers at once and fuses their results.
 
-        This method queries each retriever in the `retrievers` list with the given query and
-        additional keyword arguments. It then combines the results, ensuring that each node is
-        unique, based on the node's ID.
+        Latency is that of the slowest retriever, bounded by its timeout. Nodes returned by several retrievers are
+        merged by node ID, and the fused list is sorted by fused score.
         """
-        all_nodes = []
-        for retriever in self.retrievers:
-            # Prevent retriever changing query
-            query_copy = copy.deepcopy(query)
-            nodes = await retriever.aretrieve(query_copy, **kwargs)
-            all_nodes.extend(nodes)
-
-        # combine all nodes
-        result = []
-        node_ids = set()
-        for n in all_nodes:
-            if n.node.node_id not in node_ids:
-                result.append(n)
-                node_ids.add(n.node.node_id)
-        return result
+        results = await asyncio.gather(
+            *[
+                self._aretrieve_one(retriever, timeout, query, **kwargs)
+                for retriever, timeout in zip(self.retrievers, self.timeouts)
+            ]
+        )
+        return self._fuse(results)
+
+    async def _aretrieve_one(
+        self, retriever: RAGRetriever, timeout: Optional[float], query: QueryType, **kwargs
+    ) -> list[NodeWithScore]:
+        # Prevent retriever changing query, retrievers only reassign fields such as the embedding, a shallow copy is enough
+        query_copy = copy.copy(query)
+        if self._is_async(retriever):
+            retrieval = retriever.aretrieve(query_copy, **kwargs)
+        else:
+            # a timed out thread runs on in the background, only its results are dropped
+            retrieval = asyncio.to_thread(retriever.retrieve, query_copy, **kwargs)
+        try:
+            return await asyncio.wait_for(retrieval, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{type(retriever).__name__} timed out after {timeout}s, skip its results.")
+            return []
+
+    @staticmethod
+    def _is_async(retriever: BaseRetriever) -> bool:
+        """Whether the retriever implements `_aretrieve` itself, down to the vector store query of index retrievers."""
+        if type(retriever)._aretrieve is BaseRetriever._aretrieve:
+            return False
+        vector_store = getattr(retriever, "_vector_store", None)
+        if vector_store is not None:
+            return type(vector_store).aquery not in (VectorStore.aquery, BasePydanticVectorStore.aquery)
+        return True
+
+    def _fuse(self, results: list[list[NodeWithScore]]) -> list[NodeWithScore]:
+        fused: dict[str, NodeWithScore] = {}
+        scores: dict[str, float] = {}
+        for nodes, weight in zip(results, self.weights):
+            for node_id, score in zip([n.node.node_id for n in nodes], self._fusion_scores(nodes)):
+                scores[node_id] = scores.get(node_id, 0.0) + weight * score
+            for n in nodes:
+                fused.setdefault(n.node.node_id, n)
+
+        # stable sort keeps the first-seen order among equal scores
+        node_ids = sorted(fused, key=lambda node_id: scores[node_id], reverse=True)
+        if self.similarity_top_k is not None:
+            node_ids = node_ids[: self.similarity_top_k]
+        return [NodeWithScore(node=fused[node_id].node, score=scores[node_id]) for node_id in node_ids]
+
+    def _fusion_scores(self, nodes: list[NodeWithScore]) -> list[float]:
+        if self.fusion_mode == "rrf":
+            return [1.0 / (self.rrf_k + rank) for rank in range(1, len(nodes) + 1)]
+
+        raw = [n.score or 0.0 for n in nodes]
+        if not raw:
+            return []
+        low, high = min(raw), max(raw)
+        if high == low:
+            return [1.0] * len(raw)
+        return [(score - low) / (high - low) for score in raw]
 
     def add_nodes(self, nodes: list[BaseNode]) -> None:
         """Support add nodes."""
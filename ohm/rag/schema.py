@@ -26,6 +26,27 @@ class BaseRetrieverConfig(BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
     similarity_top_k: int = Field(default=5, description="Number of top-k similar results to return during retrieval.")
+    fusion_weight: float = Field(
+        default=1.0, description="Weight of this retriever when fusing hybrid retrieval results.", exclude=True
+    )
+    timeout: Optional[float] = Field(
+        default=None,
+        description="Seconds to wait for this retriever in hybrid retrieval, its results are skipped after that.",
+        exclude=True,
+    )
+
+
+class HybridRetrieverConfig(BaseModel):
+    """Config for fusing the results of multiple retrievers."""
+
+    fusion_mode: Literal["rrf", "weighted"] = Field(
+        default="rrf",
+        description="`rrf` sums the weighted reciprocal ranks, `weighted` sums the weighted min-max normalized scores.",
+    )
+    rrf_k: int = Field(default=60, description="Rank offset of reciprocal rank fusion, dampening the top ranks.")
+    similarity_top_k: Optional[int] = Field(
+        default=None, description="Cap of the fused results, defaults to the largest similarity_top_k of the retrievers."
+    )
 
 
 class IndexRetrieverConfig(BaseRetrieverConfig):
@@ -66,6 +87,10 @@ class BM25RetrieverConfig(IndexRetrieverConfig):
         description="Indicates whether to create an index for the nodes. It is useful when you need to persist data while only using BM25.",
         exclude=True,
     )
+    persist_path: Optional[str] = Field(
+        default=None,
+        description="Directory of a persisted BM25 index, loaded instead of re-tokenizing the nodes when it matches them.",
+    )
     _no_embedding: bool = PrivateAttr(default=True)
 
 
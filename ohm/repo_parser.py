@@ -12,16 +12,20 @@ This script is designed to create a symbols repository from the provided source
 from __future__ import annotations
 
 import ast
+import asyncio
+import hashlib
 import json
+import multiprocessing
+import os
 import re
-import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 from pydantic import BaseModel, Field, field_validator
 
-from ohm.const import AGGREGATION, COMPOSITION, GENERALIZATION
+from ohm.const import AGGREGATION, COMPOSITION, CONFIG_ROOT, GENERALIZATION
 from ohm.logs import logger
 from ohm.utils.common import any_to_str, async_read, remove_white_spaces
 from ohm.utils.exceptions import handle_exception
@@ -46,6 +50,17 @@ class RepoFileInfo(BaseModel):
     page_info: List = Field(default_factory=list)
 
 
+class SymbolsCacheEntry(BaseModel):
+    """
+    Cached symbols of a file, valid while the file has the same mtime and size, or the same content hash.
+    """
+
+    mtime_ns: int
+    size: int
+    sha256: str
+    info: Dict
+
+
 class CodeBlockInfo(BaseModel):
     """
     Repository data element representing information about a code block.
@@ -428,6 +443,10 @@ class RepoParser(BaseModel):
     """
 
     base_directory: Path = Field(default=None)
+    symbols_cache_path: Optional[Path] = Field(
+        default=None, description="The symbols cache file, defaults to one per base directory under ~/.ohm."
+    )
+    max_workers: Optional[int] = Field(default=None, description="Parser processes, defaults to the CPU count.")
 
     @classmethod
     @handle_exception(exception_type=Exception, default_return=[])
@@ -477,19 +496,150 @@ class RepoParser(BaseModel):
         Returns:
             List[RepoFileInfo]: A list of RepoFileInfo objects containing the extracted information.
         """
-        files_classes = []
-        directory = self.base_directory
+        matching_files = self._find_source_files()
+        files_classes = {}
+        for path, file_info in self._iter_symbols(matching_files):
+            files_classes[path] = file_info
+        return [files_classes[path] for path in matching_files]
 
+    def iter_symbols(self) -> Iterator[RepoFileInfo]:
+        """
+        Streams the symbols of each source file as soon as they are available, cached files first.
+
+        Yields:
+            RepoFileInfo: The extracted information of a file, in no particular order.
+        """
+        for _, file_info in self._iter_symbols(self._find_source_files()):
+            yield file_info
+
+    def _find_source_files(self) -> List[Path]:
         matching_files = []
         extensions = ["*.py"]
         for ext in extensions:
-            matching_files += directory.rglob(ext)
-        for path in matching_files:
-            tree = self._parse_file(path)
-            file_info = self.extract_class_and_function_info(tree, path)
-            files_classes.append(file_info)
+            matching_files += self.base_directory.rglob(ext)
+        return matching_files
+
+    def _iter_symbols(self, matching_files: List[Path]) -> Iterator[tuple[Path, RepoFileInfo]]:
+        cache_pathname = self._resolve_cache_path(self.base_directory, "symbols")
+        for path, info in self._iter_cached(
+            matching_files, self.base_directory, cache_pathname, _parse_symbols_batch, SYMBOLS_EXTRACTOR_VERSION
+        ):
+            file_info = RepoFileInfo.model_validate(info)
+            file_info.page_info = [CodeBlockInfo.model_validate(i) for i in file_info.page_info]
+            yield path, file_info
+
+    def _iter_cached(
+        self, matching_files: List[Path], root: Path, cache_pathname: Path, worker: Callable, version: int
+    ) -> Iterator[tuple[Path, Dict]]:
+        """
+        Yields the cached results of the unchanged files, then computes the others with `worker`.
+
+        The cache is rewritten afterwards with the entries of the files seen, so deleted files drop out of it. It is
+        also rewritten if the iteration stops early, keeping the entries of the files not reached yet, so the results
+        computed until then are not lost.
+
+        Args:
+            matching_files (List[Path]): The files to process.
+            root (Path): The directory the cache keys are relative to, passed to `worker`.
+            cache_pathname (Path): The cache file.
+            worker (Callable): A module-level function mapping (root, paths) to a list of (path, result dict).
+            version (int): The version of what `worker` extracts, a cache file of another version is ignored.
+        """
+        cache = self._load_cache(cache_pathname, version)
+        new_cache: Dict[str, SymbolsCacheEntry] = {}
+        changed = False
+        completed = False
+        try:
+            pending: List[tuple[Path, Optional[SymbolsCacheEntry]]] = []
+            for path in matching_files:
+                key = str(path.relative_to(root))
+                entry = cache.get(key)
+                try:
+                    stat = path.stat()
+                    if entry and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                        new_cache[key] = entry
+                        yield path, entry.info
+                        continue
+                    # touched files whose content did not change are not parsed again
+                    content_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+                except OSError:
+                    pending.append((path, None))
+                    continue
+                if entry and entry.sha256 == content_hash:
+                    new_cache[key] = entry.model_copy(update={"mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+                    changed = True
+                    yield path, entry.info
+                    continue
+                entry = SymbolsCacheEntry(mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha256=content_hash, info={})
+                pending.append((path, entry))
+
+            pending_entries = dict(pending)
+            for path, info in self._run_worker(worker, root, list(pending_entries)):
+                entry = pending_entries[path]
+                if entry:
+                    entry.info = info
+                    new_cache[str(path.relative_to(root))] = entry
+                    changed = True
+                yield path, info
+            completed = True
+        finally:
+            if not completed:
+                new_cache = {**cache, **new_cache}
+            if changed or (completed and len(new_cache) != len(cache)):
+                self._save_cache(cache_pathname, new_cache, version)
+
+    def _run_worker(self, worker: Callable, root: Path, paths: List[Path]) -> Iterator[tuple[Path, Dict]]:
+        """
+        Runs `worker` over the files in worker processes, or in this process if there are only a few of them.
+
+        The processes are not forked, as this may run in a thread beside a running event loop.
+        """
+        if len(paths) < PARALLEL_PARSE_MIN_FILES:
+            yield from worker(str(root), paths)
+            return
+
+        max_workers = self.max_workers or os.cpu_count() or 1
+        batch_size = max(1, min(PARSE_BATCH_SIZE, len(paths) // max_workers))
+        batches = [paths[i : i + batch_size] for i in range(0, len(paths), batch_size)]
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=_get_mp_context()) as executor:
+            futures = [executor.submit(worker, str(root), batch) for batch in batches]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def _resolve_cache_path(self, root: Path, kind: str) -> Path:
+        """
+        Returns the cache file of `kind` results, next to `symbols_cache_path` if it is set.
+        """
+        if self.symbols_cache_path:
+            pathname = Path(self.symbols_cache_path)
+            return pathname if kind == "symbols" else pathname.with_suffix(f".{kind}.json")
+        key = hashlib.sha256(str(Path(root).resolve()).encode("utf-8")).hexdigest()[:16]
+        return CONFIG_ROOT / "repo_symbols" / f"{key}.{kind}.json"
+
+    @staticmethod
+    def _load_cache(pathname: Path, version: int) -> Dict[str, SymbolsCacheEntry]:
+        if not pathname.exists():
+            return {}
+        try:
+            data = json.loads(pathname.read_text(encoding="utf-8"))
+            if not isinstance(data, dict) or data.get("version") != version:
+                logger.info(f"Ignore the symbols cache {pathname} written by another version of the parser.")
+                return {}
+            return {k: SymbolsCacheEntry.model_validate(v) for k, v in data["files"].items()}
+        except (ValueError, KeyError, AttributeError) as e:
+            logger.warning(f"Ignore the corrupted symbols cache {pathname}: {e}")
+            return {}
 
-        return files_classes
+    @staticmethod
+    def _save_cache(pathname: Path, cache: Dict[str, SymbolsCacheEntry], version: int):
+        try:
+            pathname.parent.mkdir(parents=True, exist_ok=True)
+            tmp = pathname.with_name(f".{pathname.name}.{os.getpid()}.tmp")
+            data = {"version": version, "files": {k: v.model_dump() for k, v in cache.items()}}
+            tmp.write_text(json.dumps(data, default=str), encoding="utf-8")
+            os.replace(tmp, pathname)
+        except OSError as e:
+            logger.warning(f"Failed to save the symbols cache {pathname}: {e}")
 
     def generate_json_structure(self, output_path: Path):
         """
@@ -712,10 +862,18 @@ class RepoParser(BaseModel):
 
     async def rebuild_class_views(self, path: str | Path = None):
         """
-        Executes `pylint` to reconstruct the dot format class view repository file.
+        Reconstructs the class views and class relationships of a package from the AST of its modules.
+
+        The result has the same form as the `pyreverse` dot output parsed by `_parse_classes`, with public members
+        only. Per-module results are cached by content hash, so only changed modules are parsed again, and the work
+        runs in a thread, so the event loop is not blocked.
 
         Args:
             path (str | Path): The path to the target directory or file. Default is None.
+
+        Returns:
+            Tuple[List[DotClassInfo], List[DotClassRelationship], str]: The class views, the relationships, and the
+            root path of the package.
         """
         if not path:
             path = self.base_directory
@@ -725,22 +883,147 @@ class RepoParser(BaseModel):
         init_file = path / "__init__.py"
         if not init_file.exists():
             raise ValueError("Failed to import module __init__ with error:No module named __init__.")
-        command = f"pyreverse {str(path)} -o dot"
-        output_dir = path / "__dot__"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        result = subprocess.run(command, shell=True, check=True, cwd=str(output_dir))
-        if result.returncode != 0:
-            raise ValueError(f"{result}")
-        class_view_pathname = output_dir / "classes.dot"
-        class_views = await self._parse_classes(class_view_pathname)
-        relationship_views = await self._parse_class_relationships(class_view_pathname)
-        packages_pathname = output_dir / "packages.dot"
-        class_views, relationship_views, package_root = RepoParser._repair_namespaces(
-            class_views=class_views, relationship_views=relationship_views, path=path
-        )
-        class_view_pathname.unlink(missing_ok=True)
-        packages_pathname.unlink(missing_ok=True)
-        return class_views, relationship_views, package_root
+        return await asyncio.to_thread(self._build_class_views, path)
+
+    def _build_class_views(self, path: Path) -> Tuple[List[DotClassInfo], List[DotClassRelationship], str]:
+        path = path.resolve()
+        # module names start at the outermost package containing `path`, as python imports them
+        package_dir = path
+        while package_dir.parent != package_dir and (package_dir.parent / "__init__.py").exists():
+            package_dir = package_dir.parent
+        package_root = package_dir.parent
+
+        modules = {}
+        cache_pathname = self._resolve_cache_path(path, "classes")
+        for _, info in self._iter_cached(
+            sorted(path.rglob("*.py")),
+            package_root,
+            cache_pathname,
+            _extract_class_views_batch,
+            CLASS_VIEWS_EXTRACTOR_VERSION,
+        ):
+            modules[info["module"]] = info
+
+        # fully qualified class name -> namespace of the class view, such as `pkg/mod.py:Outer:Inner`
+        class_namespaces = {}
+        for module_name, info in modules.items():
+            for c in info["classes"]:
+                namespace = info["file"] + ":" + c["qualname"].replace(".", ":")
+                class_namespaces[f"{module_name}.{c['qualname']}"] = namespace
+
+        class_views = []
+        relationship_views = []
+        for module_name in sorted(modules, key=lambda m: modules[m]["file"]):
+            info = modules[module_name]
+            for c in info["classes"]:
+                package = class_namespaces[f"{module_name}.{c['qualname']}"]
+                class_views.append(
+                    RepoParser._create_class_info(c["name"], package, c["attributes"], c["methods"])
+                )
+                for base in c["bases"]:
+                    dest = RepoParser._resolve_class(base, module_name, modules, class_namespaces)
+                    if dest:
+                        relationship_views.append(
+                            DotClassRelationship(src=package, dest=dest, relationship=GENERALIZATION)
+                        )
+                for link in c["links"]:
+                    relationship = RepoParser._resolve_link(link, module_name, modules, class_namespaces)
+                    if relationship:
+                        dest, relationship_type = relationship
+                        relationship_views.append(
+                            DotClassRelationship(
+                                src=dest, dest=package, relationship=relationship_type, label=link["name"]
+                            )
+                        )
+        return class_views, relationship_views, str(package_root).rstrip("/") + "/"
+
+    @staticmethod
+    def _create_class_info(
+        class_name: str, package: str, attribute_lines: List[str], method_lines: List[str]
+    ) -> DotClassInfo:
+        """
+        Creates a DotClassInfo object from the dot format lines of the class members.
+
+        Args:
+            class_name (str): The name of the class.
+            package (str): The package of the class.
+            attribute_lines (List[str]): Dot format lines of the attributes, such as `name : str`.
+            method_lines (List[str]): Dot format lines of the methods, such as `run(msg: Message): str`.
+
+        Returns:
+            DotClassInfo: The class info.
+        """
+        class_info = DotClassInfo(name=class_name)
+        class_info.package = package
+        for m in attribute_lines:
+            if not m:
+                continue
+            attr = DotClassAttribute.parse(m)
+            class_info.attributes[attr.name] = attr
+            for i in attr.compositions:
+                if i not in class_info.compositions:
+                    class_info.compositions.append(i)
+        for f in method_lines:
+            if not f:
+                continue
+            method = DotClassMethod.parse(f)
+            class_info.methods[method.name] = method
+            for i in method.aggregations:
+                if i not in class_info.compositions and i not in class_info.aggregations:
+                    class_info.aggregations.append(i)
+        return class_info
+
+    @staticmethod
+    def _resolve_class(name: str, module_name: str, modules: Dict[str, Dict], class_namespaces: Dict[str, str]):
+        """
+        Resolves a class name as written in a module to the namespace of a class view of the package.
+
+        Args:
+            name (str): The class name, possibly dotted, such as `Action` or `actions.Action`.
+            module_name (str): The module the name is used in.
+            modules (Dict[str, Dict]): The extracted modules, keyed by module name.
+            class_namespaces (Dict[str, str]): Class view namespaces, keyed by fully qualified class name.
+
+        Returns:
+            str | None: The namespace of the class view, None if the class is not defined in the package.
+        """
+        head, _, rest = name.partition(".")
+        imported = modules.get(module_name, {}).get("imports", {}).get(head)
+        target = imported + (f".{rest}" if rest else "") if imported else f"{module_name}.{name}"
+        # follow re-exports, such as a class imported by the `__init__` of its package
+        for _ in range(MAX_REEXPORT_DEPTH):
+            if target in class_namespaces:
+                return class_namespaces[target]
+            parts = target.split(".")
+            for i in range(len(parts) - 1, 0, -1):
+                module = modules.get(".".join(parts[:i]))
+                if module:
+                    imported = module["imports"].get(parts[i])
+                    break
+            else:
+                return None
+            if not imported:
+                return None
+            target = ".".join([imported] + parts[i + 1 :])
+        return None
+
+    @staticmethod
+    def _resolve_link(link: Dict, module_name: str, modules: Dict[str, Dict], class_namespaces: Dict[str, str]):
+        """
+        Returns the class view namespace and the relationship of an attribute to a class of the package.
+
+        An attribute assigned an instance created by the class is a composition, an attribute annotated with the
+        class is an aggregation.
+        """
+        if link.get("callee"):
+            dest = RepoParser._resolve_class(link["callee"], module_name, modules, class_namespaces)
+            if dest:
+                return dest, COMPOSITION
+        for type_name in DotClassAttribute.parse_compositions(link.get("annotation", "")):
+            dest = RepoParser._resolve_class(type_name, module_name, modules, class_namespaces)
+            if dest:
+                return dest, AGGREGATION
+        return None
 
     @staticmethod
     async def _parse_classes(class_view_pathname: Path) -> List[DotClassInfo]:
@@ -763,25 +1046,9 @@ class RepoParser(BaseModel):
             if not package_name:
                 continue
             class_name, members, functions = re.split(r"(?<!\\)\|", info)
-            class_info = DotClassInfo(name=class_name)
-            class_info.package = package_name
-            for m in members.split("\n"):
-                if not m:
-                    continue
-                attr = DotClassAttribute.parse(m)
-                class_info.attributes[attr.name] = attr
-                for i in attr.compositions:
-                    if i not in class_info.compositions:
-                        class_info.compositions.append(i)
-            for f in functions.split("\n"):
-                if not f:
-                    continue
-                method = DotClassMethod.parse(f)
-                class_info.methods[method.name] = method
-                for i in method.aggregations:
-                    if i not in class_info.compositions and i not in class_info.aggregations:
-                        class_info.aggregations.append(i)
-            class_views.append(class_info)
+            class_views.append(
+                RepoParser._create_class_info(class_name, package_name, members.split("\n"), functions.split("\n"))
+            )
         return class_views
 
     @staticmethod
@@ -1010,6 +1277,152 @@ class RepoParser(BaseModel):
         return "." + full_key[0:ix]
 
 
+PARALLEL_PARSE_MIN_FILES = 64  # below this, starting worker processes costs more than it saves
+PARSE_BATCH_SIZE = 64
+# bump these when what `extract_class_and_function_info`, or `_extract_class_views` and `_extract_class`, return
+# changes, so that the results cached by an older version are extracted again
+SYMBOLS_EXTRACTOR_VERSION = 1
+CLASS_VIEWS_EXTRACTOR_VERSION = 1
+
+
+def _get_mp_context():
+    """The context of the parser processes, which are spawned or started from a fork server instead of forked."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _parse_symbols_batch(base_directory: str, paths: List[Path]) -> List[tuple[Path, Dict]]:
+    """Worker of `RepoParser.generate_symbols`, module-level so that it can be pickled."""
+    parser = RepoParser(base_directory=Path(base_directory))
+    return [
+        (path, parser.extract_class_and_function_info(parser._parse_file(path), path).model_dump()) for path in paths
+    ]
+
+
+MAX_REEXPORT_DEPTH = 8
+
+
+def _extract_class_views_batch(package_root: str, paths: List[Path]) -> List[tuple[Path, Dict]]:
+    """Worker of `RepoParser.rebuild_class_views`, extracts the imports and classes of each module."""
+    return [(path, _extract_class_views(Path(package_root), path)) for path in paths]
+
+
+def _extract_class_views(package_root: Path, path: Path) -> Dict:
+    filename = path.relative_to(package_root)
+    parts = list(filename.with_suffix("").parts)
+    is_package = parts[-1] == "__init__"
+    if is_package:
+        parts = parts[:-1]
+    module_name = ".".join(parts)
+    info = {"module": module_name, "file": str(filename), "imports": {}, "classes": []}
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+    except (SyntaxError, ValueError, OSError) as e:
+        logger.warning(f"Skip {path}: {e}")
+        return info
+
+    package_parts = parts if is_package else parts[:-1]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    info["imports"][alias.asname] = alias.name
+                else:
+                    head = alias.name.split(".")[0]
+                    info["imports"][head] = head
+        elif isinstance(node, ast.ImportFrom):
+            base = package_parts[: len(package_parts) - node.level + 1] if node.level else []
+            base = ".".join(base + ([node.module] if node.module else []))
+            for alias in node.names:
+                if alias.name != "*":
+                    info["imports"][alias.asname or alias.name] = f"{base}.{alias.name}" if base else alias.name
+
+    def visit(body, prefix: str):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                qualname = f"{prefix}{node.name}"
+                info["classes"].append(_extract_class(node, qualname))
+                visit(node.body, f"{qualname}.")
+
+    visit(tree.body, "")
+    return info
+
+
+def _extract_class(node: ast.ClassDef, qualname: str) -> Dict:
+    attributes: Dict[str, tuple[str, Optional[str], str]] = {}  # name -> (type, callee, annotation)
+    methods = []
+
+    def add_attribute(name: str, annotation, value):
+        if name.startswith("_"):
+            return
+        annotation = ast.unparse(annotation) if annotation else ""
+        callee = ast.unparse(value.func) if isinstance(value, ast.Call) else None
+        type_ = annotation or _infer_type(value)
+        if name not in attributes or (annotation and not attributes[name][2]):
+            attributes[name] = (type_, callee, annotation)
+
+    for stmt in node.body:
+        if isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name):
+            add_attribute(stmt.target.id, stmt.annotation, stmt.value)
+        elif isinstance(stmt, ast.Assign):
+            for target in stmt.targets:
+                if isinstance(target, ast.Name):
+                    add_attribute(target.id, None, stmt.value)
+        elif is_func(stmt):
+            decorators = {ast.unparse(d).split(".")[-1] for d in stmt.decorator_list}
+            args = stmt.args.posonlyargs + stmt.args.args
+            receiver = None
+            if args and "staticmethod" not in decorators:
+                receiver, args = args[0].arg, args[1:]
+            # instance attributes assigned in the methods, such as `self.name: str = name`
+            for sub in ast.walk(stmt):
+                if isinstance(sub, ast.Assign):
+                    targets = sub.targets
+                elif isinstance(sub, ast.AnnAssign):
+                    targets = [sub.target]
+                else:
+                    continue
+                for target in targets:
+                    if (
+                        isinstance(target, ast.Attribute)
+                        and isinstance(target.value, ast.Name)
+                        and target.value.id == receiver
+                    ):
+                        add_attribute(target.attr, getattr(sub, "annotation", None), sub.value)
+            if stmt.name.startswith("_"):
+                continue
+            arg_parts = [
+                f"{a.arg}: {ast.unparse(a.annotation)}" if a.annotation else a.arg for a in args + stmt.args.kwonlyargs
+            ]
+            line = f"{stmt.name}({', '.join(arg_parts)})"
+            if stmt.returns:
+                line += f": {ast.unparse(stmt.returns)}"
+            methods.append(line)
+
+    return {
+        "name": node.name,
+        "qualname": qualname,
+        "bases": [ast.unparse(b) for b in node.bases],
+        "attributes": [f"{name} : {type_}" if type_ else name for name, (type_, _, _) in attributes.items()],
+        "methods": methods,
+        "links": [
+            {"name": name, "callee": callee, "annotation": annotation}
+            for name, (_, callee, annotation) in attributes.items()
+            if callee or annotation
+        ],
+    }
+
+
+def _infer_type(value) -> str:
+    """Returns the type of a literal or constructor call value, empty if unknown."""
+    if isinstance(value, ast.Constant):
+        return "" if value.value is None else type(value.value).__name__
+    if isinstance(value, ast.Call):
+        return ast.unparse(value.func)
+    literals = {ast.List: "list", ast.Dict: "dict", ast.Set: "set", ast.Tuple: "tuple"}
+    return literals.get(type(value), "")
+
+
 def is_func(node) -> bool:
     """
     Returns True if the given node represents a function.
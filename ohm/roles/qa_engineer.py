@@ -14,6 +14,7 @@
 @Modified By: mashenquan, 2023-12-5. Enhance the workflow to navigate to WriteCode or QaEngineer based on the results
     of SummarizeCode.
 """
+import asyncio
 from typing import Optional
 
 from pydantic import BaseModel, Field
@@ -178,6 +179,7 @@ class QaEngineer(Role):
         code_filters = any_to_str_set({PrepareDocuments, SummarizeCode})
         test_filters = any_to_str_set({WriteTest, DebugError})
         run_filters = any_to_str_set({RunCode})
+        run_msgs = []
         for msg in self.rc.news:
             # Decide what to do based on observed msg type, currently defined by human,
             # might potentially be moved to _think, that is, let the agent decides for itself
@@ -185,13 +187,15 @@ class QaEngineer(Role):
                 # engineer wrote a code, time to write a test for it
                 await self._write_test(msg)
             elif msg.cause_by in test_filters:
-                # I wrote or debugged my test code, time to run it
-                await self._run_code(msg)
+                # I wrote or debugged my test code, time to run it, the test files are independent so run them together
+                run_msgs.append(msg)
             elif msg.cause_by in run_filters:
                 # I ran my test code, time to fix bugs, if any
                 await self._debug_error(msg)
             elif msg.cause_by == any_to_str(UserRequirement):
+                await asyncio.gather(*[self._run_code(m) for m in run_msgs])
                 return await self._parse_user_requirement(msg)
+        await asyncio.gather(*[self._run_code(m) for m in run_msgs])
         self.test_round += 1
         kvs = self.input_args.model_dump()
         kvs["changed_test_filenames"] = [
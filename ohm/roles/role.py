@@ -154,6 +154,8 @@ class Role(BaseRole, SerializationMixin, ContextMixin, BaseModel):
     latest_observed_msg: Optional[
         Message] = None  # record the latest observed message when interrupted
     observe_all_msg_from_buffer: bool = False  # whether to save all msgs from buffer to memory for role's awareness
+    # whether concurrent `run` calls on this instance are safe, they share rc.news, rc.todo and rc.memory otherwise
+    reentrant: bool = False
 
     __hash__ = object.__hash__  # support Role as hashable type in `Environment.members`
 
@@ -36,6 +36,8 @@ class Team(BaseModel):
     investment: float = Field(default=10.0)
     idea: str = Field(default="")
     use_mgx: bool = Field(default=True)
+    event_driven: bool = Field(default=False, description="Run roles as messages arrive instead of in rounds.")
+    role_concurrency: dict[str, int] = Field(default_factory=dict, description="Concurrent runs per reentrant role name.")
 
     def __init__(self, context: Context = None, **data: Any):
         super(Team, self).__init__(**data)
@@ -123,6 +125,12 @@ class Team(BaseModel):
         if idea:
             self.run_project(idea=idea, send_to=send_to)
 
+        if self.event_driven:
+            await self.env.run_event_driven(
+                max_runs=n_round, role_concurrency=self.role_concurrency, before_run=self._check_balance
+            )
+            n_round = 0
+
         while n_round > 0:
             if self.env.is_idle:
                 logger.debug("All roles are idle.")
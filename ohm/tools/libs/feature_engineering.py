@@ -11,7 +11,6 @@ import itertools
 # import lightgbm as lgb
 import numpy as np
 import pandas as pd
-from joblib import Parallel, delayed
 from pandas.core.dtypes.common import is_object_dtype
 from sklearn.feature_selection import VarianceThreshold
 from sklearn.model_selection import KFold
@@ -141,16 +140,32 @@ class KFoldTargetMeanEncoder(MLProcess):
         self.encoder_dict = None
 
     def fit(self, df: pd.DataFrame):
-        tmp = df.copy()
         kf = KFold(n_splits=self.n_splits, shuffle=True, random_state=self.random_state)
 
-        global_mean = tmp[self.label].mean()
-        col_name = f"{self.col}_kf_target_mean"
-        for trn_idx, val_idx in kf.split(tmp, tmp[self.label]):
-            _trn, _val = tmp.iloc[trn_idx], tmp.iloc[val_idx]
-            tmp.loc[tmp.index[val_idx], col_name] = _val[self.col].map(_trn.groupby(self.col)[self.label].mean())
-        tmp[col_name].fillna(global_mean, inplace=True)
-        self.encoder_dict = tmp.groupby(self.col)[col_name].mean().to_dict()
+        # category means per fold from integer codes with bincount, instead of a groupby and a map per fold
+        codes, uniques = pd.factorize(df[self.col])
+        n_cats = len(uniques)
+        label = df[self.label].to_numpy(dtype=float)
+        has_label = ~np.isnan(label)
+        global_mean = label[has_label].mean() if has_label.any() else np.nan
+
+        oof = np.full(len(df), np.nan)
+        for trn_idx, val_idx in kf.split(df, label):
+            trn_idx = trn_idx[(codes[trn_idx] >= 0) & has_label[trn_idx]]
+            sums = np.bincount(codes[trn_idx], weights=label[trn_idx], minlength=n_cats)
+            counts = np.bincount(codes[trn_idx], minlength=n_cats)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = sums / counts
+            val_idx = val_idx[codes[val_idx] >= 0]
+            oof[val_idx] = means[codes[val_idx]]
+        oof[np.isnan(oof)] = global_mean
+
+        valid = codes >= 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            encoded = np.bincount(codes[valid], weights=oof[valid], minlength=n_cats) / np.bincount(
+                codes[valid], minlength=n_cats
+            )
+        self.encoder_dict = dict(zip(uniques, encoded.tolist()))
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         new_df = df.copy()
@@ -175,43 +190,24 @@ class CatCross(MLProcess):
         self.cols = cols
         self.max_cat_num = max_cat_num
         self.combs = []
-        self.combs_map = {}
-
-    @staticmethod
-    def _cross_two(comb, df):
-        """
-        Cross two columns and convert them to numerical features.
-
-        Args:
-            comb (tuple): The pair of columns to be crossed.
-            df (pd.DataFrame): The input DataFrame.
-
-        Returns:
-            tuple: The new column name and the crossed feature map.
-        """
-        new_col = f"{comb[0]}_{comb[1]}"
-        new_col_combs = list(itertools.product(df[comb[0]].unique(), df[comb[1]].unique()))
-        ll = list(range(len(new_col_combs)))
-        comb_map = dict(zip(new_col_combs, ll))
-        return new_col, comb_map
+        self.categories = {}
 
     def fit(self, df: pd.DataFrame):
-        for col in self.cols:
-            if df[col].nunique() > self.max_cat_num:
-                self.cols.remove(col)
+        self.cols = [col for col in self.cols if df[col].nunique() <= self.max_cat_num]
         self.combs = list(itertools.combinations(self.cols, 2))
-        res = Parallel(n_jobs=4, require="sharedmem")(delayed(self._cross_two)(comb, df) for comb in self.combs)
-        self.combs_map = dict(res)
+        # unique values in order of appearance, the pair (a_i, b_j) is crossed to i * len(b) + j
+        self.categories = {col: pd.Index(df[col].unique()) for col in self.cols}
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         new_df = df.copy()
+        codes = {col: self.categories[col].get_indexer(df[col]) for col in self.cols}
         for comb in self.combs:
             new_col = f"{comb[0]}_{comb[1]}"
-            _map = self.combs_map[new_col]
-            new_df[new_col] = pd.Series(zip(new_df[comb[0]], new_df[comb[1]])).map(_map)
+            codes_a, codes_b = codes[comb[0]], codes[comb[1]]
+            n_b = len(self.categories[comb[1]])
+            unknown = len(self.categories[comb[0]]) * n_b
             # set the unknown value to a new number
-            new_df[new_col].fillna(max(_map.values()) + 1, inplace=True)
-            new_df[new_col] = new_df[new_col].astype(int)
+            new_df[new_col] = np.where((codes_a >= 0) & (codes_b >= 0), codes_a * n_b + codes_b, unknown)
         return new_df
 
 
@@ -243,7 +239,10 @@ class GroupStat(MLProcess):
         self.group_df = group_df
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
-        new_df = df.merge(self.group_df, on=self.group_col, how="left")
+        # a hash lookup of the group keys, like a left merge without the copy of all rows and with the index kept
+        stats = self.group_df.set_index(self.group_col).reindex(df[self.group_col])
+        stats.index = df.index
+        new_df = pd.concat([df, stats], axis=1)
         return new_df
 
 
@@ -11,6 +11,8 @@ from ohm.logs import logger
 from ohm.tools.tool_registry import register_tool
 from ohm.utils.report import END_MARKER_VALUE, TerminalReporter
 
+READ_CHUNK_SIZE = 64 * 1024
+
 
 @register_tool()
 class Terminal:
@@ -27,6 +29,7 @@ class Terminal:
         self.stdout_queue = Queue(maxsize=1000)
         self.observer = TerminalReporter()
         self.process: Optional[asyncio.subprocess.Process] = None
+        self._stdout_remainder = b""  # bytes read past the end marker, they belong to the next command
         #  The cmd in forbidden_terminal_commands will be replace by pass ana return the advise. example:{"cmd":"forbidden_reason/advice"}
         self.forbidden_commands = {
             "run dev": "Use Deployer.deploy_to_public instead.",
@@ -140,27 +143,53 @@ class Terminal:
             # Read the output until the unique marker is found.
             # We read bytes directly from stdout instead of text because when reading text,
             # '\r' is changed to '\n', resulting in excessive output.
-            tmp = b""
+            # Whatever is available is read at once, up to READ_CHUNK_SIZE, and the lines of each read are reported
+            # together. Bytes read past the marker are kept for the next command.
+            tmp = bytearray()  # last line of the output so far, held back until more output follows it
+            chunk, self._stdout_remainder = self._stdout_remainder, b""
             while True:
-                output = tmp + await self.process.stdout.read(1)
-                if not output:
+                if not chunk:
+                    chunk = await self.process.stdout.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        continue
+                chunk_lines = chunk.splitlines(True)
+                chunk = b""
+                if tmp.endswith((b"\n", b"\r")):
+                    chunk_lines.insert(0, bytes(tmp))
+                elif len(chunk_lines) == 1:
+                    tmp += chunk_lines[0]  # still no line break, avoid copying the whole line again
                     continue
-                *lines, tmp = output.splitlines(True)
-                for line in lines:
-                    line = line.decode()
+                else:
+                    chunk_lines[0] = bytes(tmp) + chunk_lines[0]
+                *raw_lines, last = chunk_lines
+                tmp = bytearray(last)
+                lines = []
+                for i, raw_line in enumerate(raw_lines):
+                    line = raw_line.decode()
                     ix = line.rfind(END_MARKER_VALUE)
                     if ix >= 0:
+                        rest = b"".join(raw_lines[i + 1 :]) + bytes(tmp)
+                        # skip the line break echoed after the marker, unless it already ended this line
+                        self._stdout_remainder = rest[1:] if line.endswith(END_MARKER_VALUE) else rest
+                        await self._report_output(observer, lines, cmd_output, daemon)
                         line = line[0:ix]
                         if line:
                             await observer.async_report(line, "output")
                             # report stdout in real-time
                             cmd_output.append(line)
                         return "".join(cmd_output)
-                    # log stdout in real-time
-                    await observer.async_report(line, "output")
-                    cmd_output.append(line)
-                    if daemon:
-                        await self.stdout_queue.put(line)
+                    lines.append(line)
+                # log stdout in real-time
+                await self._report_output(observer, lines, cmd_output, daemon)
+
+    async def _report_output(self, observer: TerminalReporter, lines: list[str], cmd_output: list[str], daemon: bool):
+        if not lines:
+            return
+        await observer.async_report("".join(lines), "output")
+        cmd_output.extend(lines)
+        if daemon:
+            for line in lines:
+                await self.stdout_queue.put(line)
 
     async def close(self):
         """Close the persistent shell process."""
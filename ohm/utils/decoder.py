@@ -289,9 +289,24 @@ class CustomDecoder(json.JSONDecoder):
             strict=strict,
             object_pairs_hook=object_pairs_hook,
         )
+        # the standard decoder uses the C scanner, valid JSON parses the same with both
+        self.fast_decoder = json.JSONDecoder(
+            object_hook=object_hook,
+            parse_float=parse_float,
+            parse_int=parse_int,
+            parse_constant=parse_constant,
+            strict=strict,
+            object_pairs_hook=object_pairs_hook,
+        )
         self.parse_object = JSONObject
         self.parse_string = py_scanstring
         self.scan_once = py_make_scanner(self)
 
-    def decode(self, s, _w=json.decoder.WHITESPACE.match):
+    def decode(self, s, _w=json.decoder.WHITESPACE.match, fast_path: bool = True):
+        """Decode with the C scanner first, and with the tolerant pure-Python scanner only if that fails."""
+        if fast_path:
+            try:
+                return self.fast_decoder.decode(s)
+            except json.JSONDecodeError:
+                pass
         return super().decode(s)
@@ -8,6 +8,7 @@
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import re
 from pathlib import Path
@@ -30,6 +31,7 @@ class DependencyFile:
         """
         self._dependencies = {}
         self._filename = Path(workdir) / ".dependencies.json"
+        self._update_lock = asyncio.Lock()  # serializes the load-modify-save of concurrent updates
 
     async def load(self):
         """Load dependencies from the file asynchronously."""
@@ -52,30 +54,31 @@ class DependencyFile:
         :param dependencies: The set of dependencies.
         :param persist: Whether to persist the changes immediately.
         """
-        if persist:
-            await self.load()
-
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root).as_posix()
-        except ValueError:
-            key = filename
-        key = str(key)
-        if dependencies:
-            relative_paths = []
-            for i in dependencies:
-                try:
-                    s = str(Path(i).relative_to(root).as_posix())
-                except ValueError:
-                    s = str(i)
-                relative_paths.append(s)
-
-            self._dependencies[key] = relative_paths
-        elif key in self._dependencies:
-            del self._dependencies[key]
-
-        if persist:
-            await self.save()
+        async with self._update_lock:
+            if persist:
+                await self.load()
+
+            root = self._filename.parent
+            try:
+                key = Path(filename).relative_to(root).as_posix()
+            except ValueError:
+                key = filename
+            key = str(key)
+            if dependencies:
+                relative_paths = []
+                for i in dependencies:
+                    try:
+                        s = str(Path(i).relative_to(root).as_posix())
+                    except ValueError:
+                        s = str(i)
+                    relative_paths.append(s)
+
+                self._dependencies[key] = relative_paths
+            elif key in self._dependencies:
+                del self._dependencies[key]
+
+            if persist:
+                await self.save()
 
     async def get(self, filename: Path | str, persist=True):
         """Get dependencies for a file asynchronously.
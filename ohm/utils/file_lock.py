@@ -0,0 +1,41 @@
+"""Advisory inter-process locks on lock files, and liveness of the processes that own per-process files."""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str | Path):
+    """Hold an exclusive lock on the file at `path`, created if missing, blocking until it is acquired.
+
+    The lock is advisory and a no-op where fcntl is not available.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def is_process_alive(pid: int) -> bool:
+    """Whether a process with this pid is running, assumed so if it cannot be told."""
+    if pid == os.getpid() or os.name == "nt":  # os.kill would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError, OverflowError):
+        return True
+    return True
@@ -1,16 +1,55 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import stat
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import aiofiles
 
 from ohm.logs import logger
 from ohm.schema import Document
 from ohm.utils.common import async_read, async_write
 from ohm.utils.json_to_markdown import json_to_markdown
 
+MAX_CONCURRENT_READS = 16
+CONTENT_CACHE_MAX_ENTRIES = 4096
+CONTENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+BINARY_SNIFF_SIZE = 8192  # a NUL byte in the head of a file marks it as binary, like git does
+
+# absolute path -> (mtime_ns, size, content), shared by all FileRepository instances
+_content_cache: OrderedDict[str, Tuple[int, int, str]] = OrderedDict()
+_content_cache_bytes = 0  # total size of the files cached
+
+
+def _cache_content(key: str, st: os.stat_result, content: str):
+    """Cache the content of a file, unless it was modified within the last second.
+
+    A file rewritten within one mtime tick may keep its mtime and size, so content read that soon after a write could
+    be served stale later on.
+    """
+    global _content_cache_bytes
+    _uncache_content(key)
+    if time.time_ns() - st.st_mtime_ns <= 1_000_000_000 or st.st_size > CONTENT_CACHE_MAX_BYTES:
+        return
+    _content_cache[key] = (st.st_mtime_ns, st.st_size, content)
+    _content_cache_bytes += st.st_size
+    while len(_content_cache) > CONTENT_CACHE_MAX_ENTRIES or _content_cache_bytes > CONTENT_CACHE_MAX_BYTES:
+        _, (_, size, _) = _content_cache.popitem(last=False)
+        _content_cache_bytes -= size
+
+
+def _uncache_content(key: str):
+    global _content_cache_bytes
+    cached = _content_cache.pop(key, None)
+    if cached:
+        _content_cache_bytes -= cached[1]
+
 
 class FileRepository:
     """A class representing a FileRepository associated with a Git repository.
@@ -46,6 +85,7 @@ class FileRepository:
         pathname.parent.mkdir(parents=True, exist_ok=True)
         content = content if content else ""  # avoid `argument must be str, not None` to make it continue
         await async_write(filename=str(pathname), data=content)
+        _uncache_content(str(pathname))
         logger.info(f"save to: {str(pathname)}")
 
         if dependencies is not None:
@@ -86,33 +126,88 @@ class FileRepository:
         :param filename: The filename or path within the repository.
         :return: The content of the file.
         """
-        doc = Document(root_path=str(self.root_path), filename=str(filename))
-        path_name = self.workdir / filename
-        if not path_name.exists():
-            return None
-        if not path_name.is_file():
-            return None
-        doc.content = await async_read(path_name)
-        return doc
+        return await self._read(filename)
+
+    async def get_many(
+        self,
+        filenames: Iterable[Path | str],
+        max_concurrency: int = MAX_CONCURRENT_READS,
+        max_size: Optional[int] = None,
+        skip_binary: bool = False,
+    ) -> List[Document | None]:
+        """Read the content of files concurrently.
+
+        The content of a file is cached until its mtime or size changes, so reading an unchanged file again is free.
+        Files modified within the last second are not cached, and the cache is bounded in entries and in bytes.
+
+        :param filenames: The filenames or paths within the repository.
+        :param max_concurrency: The maximum number of files read at the same time.
+        :param max_size: Files larger than this many bytes are skipped, if set.
+        :param skip_binary: Whether to skip binary files.
+        :return: The Document of each file, in the order of `filenames`, None for a file missing or skipped.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _read(filename: Path | str) -> Document | None:
+            async with semaphore:
+                return await self._read(filename, max_size=max_size, skip_binary=skip_binary)
 
-    async def get_all(self, filter_ignored=True) -> List[Document]:
+        return list(await asyncio.gather(*[_read(f) for f in filenames]))
+
+    async def get_all(
+        self,
+        filter_ignored=True,
+        max_concurrency: int = MAX_CONCURRENT_READS,
+        max_size: Optional[int] = None,
+        skip_binary: bool = False,
+    ) -> List[Document]:
         """Get the content of all files in the repository.
 
+        See `get_many` for the reading options.
+
         :return: List of Document instances representing files.
         """
-        docs = []
         if filter_ignored:
-            for f in self.all_files:
-                doc = await self.get(f)
-                docs.append(doc)
+            filenames = self.all_files
         else:
+            filenames = []
             for root, dirs, files in os.walk(str(self.workdir)):
                 for file in files:
                     file_path = Path(root) / file
-                    relative_path = file_path.relative_to(self.workdir)
-                    doc = await self.get(relative_path)
-                    docs.append(doc)
-        return docs
+                    filenames.append(file_path.relative_to(self.workdir))
+        docs = await self.get_many(filenames, max_concurrency=max_concurrency, max_size=max_size, skip_binary=skip_binary)
+        return [doc for doc in docs if doc]
+
+    async def _read(
+        self, filename: Path | str, max_size: Optional[int] = None, skip_binary: bool = False
+    ) -> Document | None:
+        path_name = self.workdir / filename
+        try:
+            st = os.stat(path_name)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        if max_size is not None and st.st_size > max_size:
+            logger.info(f"Skip {str(path_name)}: {st.st_size} bytes exceeds {max_size}")
+            return None
+
+        key = str(path_name)
+        cached = _content_cache.get(key)
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _content_cache.move_to_end(key)
+            content = cached[2]
+            if skip_binary and "\0" in content[:BINARY_SNIFF_SIZE]:
+                return None
+        else:
+            if skip_binary:
+                async with aiofiles.open(key, mode="rb") as reader:
+                    head = await reader.read(BINARY_SNIFF_SIZE)
+                if b"\0" in head:
+                    return None
+            content = await async_read(path_name)
+            _cache_content(key, st, content)
+        return Document(root_path=str(self.root_path), filename=str(filename), content=content)
 
     @property
     def workdir(self):
@@ -225,6 +320,7 @@ class FileRepository:
         if not pathname.exists():
             return
         pathname.unlink(missing_ok=True)
+        _uncache_content(str(pathname))
 
         dependency_file = await self._git_repo.get_dependency()
         await dependency_file.update(filename=pathname, dependencies=None)
@@ -8,13 +8,15 @@
 """
 from __future__ import annotations
 
+import os
 import re
 import shutil
+import time
 import uuid
 from enum import Enum
 from pathlib import Path
 from subprocess import TimeoutExpired
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from urllib.parse import quote
 
 from git.repo import Repo
@@ -26,7 +28,7 @@ from github.Label import Label
 from github.Milestone import Milestone
 from github.NamedUser import NamedUser
 from github.PullRequest import PullRequest
-from gitignore_parser import parse_gitignore
+from gitignore_parser import rule_from_pattern
 from pydantic import BaseModel
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
@@ -52,6 +54,39 @@ class RateLimitError(Exception):
         super().__init__(self.message)
 
 
+class GitignoreMatcher:
+    """The rules of a `.gitignore` file, compiled once.
+
+    Like the matcher returned by `gitignore_parser.parse_gitignore`, calling it with a path under the directory of the
+    `.gitignore` file tells whether the path is ignored. `match_relative` skips the path normalization, for callers
+    that already hold the posix path relative to that directory.
+    """
+
+    def __init__(self, full_path: str | Path):
+        self.base_dir = Path(os.path.abspath(Path(full_path).parent))
+        with open(full_path) as reader:
+            rules = [rule_from_pattern(line.rstrip("\n"), base_path=self.base_dir) for line in reader]
+        rules = [r for r in rules if r]
+        self._rules = [(re.compile(r.regex), r.negation) for r in rules]
+        # Without negations, the path is ignored if any rule matches, which a single alternation answers.
+        self._any = None
+        if rules and not any(r.negation for r in rules):
+            self._any = re.compile("|".join(f"(?:{r.regex})" for r in rules))
+
+    def __call__(self, path: str | Path) -> bool:
+        rel_path = Path(os.path.abspath(path)).relative_to(self.base_dir).as_posix()
+        return self.match_relative(rel_path, is_dir=str(path).endswith("/"))
+
+    def match_relative(self, rel_path: str, is_dir: bool = False) -> bool:
+        if self._any is not None:
+            return self._any.search(rel_path) is not None
+        for regex, negation in reversed(self._rules):
+            # A directory-only negation only matches a path with a trailing slash.
+            if regex.search(rel_path + "/" if negation and is_dir else rel_path):
+                return not negation
+        return False
+
+
 class GitBranch(BaseModel):
     head: str
     base: str
@@ -77,6 +112,7 @@ class GitRepository:
         self._repository = None
         self._dependency = None
         self._gitignore_rules = None
+        self._listing_cache: Dict[str, Tuple[int, List[Tuple[str, bool]]]] = {}  # directory -> (mtime_ns, entries)
         if local_path:
             self.open(local_path=Path(local_path), auto_init=auto_init)
 
@@ -89,7 +125,7 @@ class GitRepository:
         local_path = Path(local_path)
         if self.is_git_dir(local_path):
             self._repository = Repo(local_path)
-            self._gitignore_rules = parse_gitignore(full_path=str(local_path / ".gitignore"))
+            self._gitignore_rules = GitignoreMatcher(full_path=local_path / ".gitignore")
             return
         if not auto_init:
             return
@@ -109,7 +145,7 @@ class GitRepository:
             writer.write("\n".join(ignores))
         self._repository.index.add([".gitignore"])
         self._repository.index.commit("Add .gitignore")
-        self._gitignore_rules = parse_gitignore(full_path=gitignore_filename)
+        self._gitignore_rules = GitignoreMatcher(full_path=gitignore_filename)
 
     def add_change(self, files: Dict):
         """Add or remove files from the staging area based on the provided changes.
@@ -345,13 +381,15 @@ class GitRepository:
                 return
         logger.info(f"Rename directory {str(self.workdir)} to {str(new_path)}")
         self._repository = Repo(new_path)
-        self._gitignore_rules = parse_gitignore(full_path=str(new_path / ".gitignore"))
+        self._gitignore_rules = GitignoreMatcher(full_path=new_path / ".gitignore")
+        self._listing_cache.clear()
 
     def get_files(self, relative_path: Path | str, root_relative_path: Path | str = None, filter_ignored=True) -> List:
         """
         Retrieve a list of files in the specified relative path.
 
-        The method returns a list of file paths relative to the current FileRepository.
+        The method returns a list of file paths relative to the current FileRepository. Directories ignored by
+        .gitignore are not walked, and the listing of each directory is reused until its mtime changes.
 
         :param relative_path: The relative path within the repository.
         :type relative_path: Path or str
@@ -369,28 +407,65 @@ class GitRepository:
 
         if not root_relative_path:
             root_relative_path = Path(self.workdir) / relative_path
+        root_relative_path = Path(root_relative_path)
+        directory_path = Path(self.workdir) / relative_path
+        if not directory_path.exists():
+            return []
+        ignored = self._gitignore_rules if filter_ignored else None
         files = []
         try:
-            directory_path = Path(self.workdir) / relative_path
-            if not directory_path.exists():
-                return []
-            for file_path in directory_path.iterdir():
-                if not file_path.is_relative_to(root_relative_path):
-                    continue
-                if file_path.is_file():
-                    rpath = file_path.relative_to(root_relative_path)
-                    files.append(str(rpath))
-                else:
-                    subfolder_files = self.get_files(
-                        relative_path=file_path, root_relative_path=root_relative_path, filter_ignored=False
-                    )
-                    files.extend(subfolder_files)
+            self._walk(directory_path, root_relative_path, ignored, files)
         except Exception as e:
             logger.error(f"Error: {e}")
-        if not filter_ignored:
-            return files
-        filtered_files = self.filter_gitignore(filenames=files, root_relative_path=root_relative_path)
-        return filtered_files
+        return files
+
+    def _walk(self, directory_path: Path, root_relative_path: Path, ignored: GitignoreMatcher | None, files: List[str]):
+        """Depth-first walk appending the files under `directory_path`, relative to `root_relative_path`.
+
+        An ignored directory is pruned rather than walked: as with git, no file under it can be re-included. Above
+        `root_relative_path`, only the directories leading to it are walked.
+        """
+        inside = directory_path.is_relative_to(root_relative_path)
+        rel_dir = ""
+        if ignored:
+            rel_dir = Path(os.path.abspath(directory_path)).relative_to(ignored.base_dir).as_posix()
+            rel_dir = "" if rel_dir == "." else rel_dir + "/"
+        for name, is_dir in self._list_dir(directory_path):
+            if ignored and (
+                (is_dir and name == ".git" and not rel_dir) or ignored.match_relative(rel_dir + name, is_dir=is_dir)
+            ):
+                continue
+            file_path = directory_path / name
+            if is_dir:
+                if inside or root_relative_path.is_relative_to(file_path):
+                    self._walk(file_path, root_relative_path, ignored, files)
+            elif inside:
+                files.append(str(file_path.relative_to(root_relative_path)))
+
+    def _list_dir(self, directory_path: Path) -> List[Tuple[str, bool]]:
+        """Return the (name, is_dir) entries of a directory, cached until the mtime of the directory changes.
+
+        Adding, removing or renaming an entry updates the mtime of its directory, so the check costs one stat per
+        directory instead of a listing. A directory modified within the last second is not cached, as a change in the
+        same mtime tick would go unnoticed on filesystems with a coarse timestamp resolution.
+        """
+        key = str(directory_path)
+        mtime_ns = os.stat(key).st_mtime_ns
+        cached = self._listing_cache.get(key)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        entries = []
+        with os.scandir(key) as it:
+            for entry in it:
+                if entry.is_dir():
+                    entries.append((entry.name, True))
+                elif entry.is_file():
+                    entries.append((entry.name, False))
+        if time.time_ns() - mtime_ns > 1_000_000_000:
+            self._listing_cache[key] = (mtime_ns, entries)
+        else:
+            self._listing_cache.pop(key, None)
+        return entries
 
     def filter_gitignore(self, filenames: List[str], root_relative_path: Path | str = None) -> List[str]:
         """
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : columnar_store.py
+@Desc    : Binary columnar persistence for triple stores: an interned string table plus an int32 (subject,
+    predicate, object) array, with append-only delta segments for incremental saves.
+
+    Layout of a store directory:
+        strings.bin    utf-8 bytes of all strings, concatenated
+        offsets.npy    int64[n + 1], string i is strings.bin[offsets[i]:offsets[i + 1]]
+        triples.npy    int32[m, 3], string ids of the triples of the snapshot
+        delta_*.npz    changes saved after the snapshot, applied in name order
+
+    The string table only ever grows, so the ids referenced by a delta stay valid when a later snapshot rewrites the
+    table, and replaying a delta that a snapshot already contains is harmless.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+STRINGS_FILENAME = "strings.bin"
+OFFSETS_FILENAME = "offsets.npy"
+TRIPLES_FILENAME = "triples.npy"
+DELTA_GLOB = "delta_*.npz"
+
+Triple = Tuple[str, str, str]
+
+
+class StringTable:
+    """Interned strings, each identified by its position in the table."""
+
+    def __init__(self, strings: List[str] = None):
+        self.strings: List[str] = strings or []
+        self.ids = {s: i for i, s in enumerate(self.strings)}
+
+    def intern(self, value: str) -> int:
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+    def encode(self, triples: Iterable[Triple]) -> np.ndarray:
+        ids = [self.intern(v) for triple in triples for v in triple]
+        return np.array(ids, dtype=np.int32).reshape(-1, 3)
+
+    def decode(self, ids: np.ndarray) -> Iterator[Triple]:
+        strings = self.strings
+        for s, p, o in ids.tolist():
+            yield strings[s], strings[p], strings[o]
+
+
+class ColumnarTripleStore:
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    @property
+    def exists(self) -> bool:
+        return (self.directory / TRIPLES_FILENAME).exists()
+
+    @property
+    def deltas(self) -> List[Path]:
+        return sorted(self.directory.glob(DELTA_GLOB))
+
+    def load(self) -> Tuple[StringTable, np.ndarray, List[Tuple[np.ndarray, np.ndarray]]]:
+        """Return the string table, the snapshot triples (memory-mapped) and the (added, deleted) ids of each delta."""
+        blob = (self.directory / STRINGS_FILENAME).read_bytes()
+        offsets = np.load(self.directory / OFFSETS_FILENAME).tolist()
+        table = StringTable([blob[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)])
+        triples = np.load(self.directory / TRIPLES_FILENAME, mmap_mode="r")
+
+        deltas = []
+        for path in self.deltas:
+            with np.load(path) as data:
+                base = int(data["base"])
+                blob, offsets = data["strings"].tobytes(), data["offsets"].tolist()
+                for i in range(len(table.strings) - base, len(offsets) - 1):
+                    table.intern(blob[offsets[i] : offsets[i + 1]].decode("utf-8"))
+                deltas.append((data["added"], data["deleted"]))
+        return table, triples, deltas
+
+    def write_snapshot(self, table: StringTable, triples: Iterable[Triple]):
+        ids = table.encode(triples)
+        blob, offsets = self._pack(table.strings)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._replace(STRINGS_FILENAME, lambda f: f.write(blob))
+        self._replace(OFFSETS_FILENAME, lambda f: np.save(f, offsets))
+        self._replace(TRIPLES_FILENAME, lambda f: np.save(f, ids))
+        for path in self.deltas:
+            path.unlink()
+
+    def write_delta(self, table: StringTable, added: Iterable[Triple], deleted: Iterable[Triple]):
+        base = len(table.strings)
+        added_ids, deleted_ids = table.encode(added), table.encode(deleted)
+        blob, offsets = self._pack(table.strings[base:])
+        deltas = self.deltas
+        seq = int(deltas[-1].stem.split("_")[-1]) + 1 if deltas else 0
+        self._replace(
+            f"delta_{seq:08d}.npz",
+            lambda f: np.savez(
+                f,
+                base=np.int64(base),
+                strings=np.frombuffer(blob, dtype=np.uint8),
+                offsets=offsets,
+                added=added_ids,
+                deleted=deleted_ids,
+            ),
+        )
+
+    @staticmethod
+    def _pack(strings: List[str]) -> Tuple[bytes, np.ndarray]:
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return b"".join(encoded), offsets
+
+    def _replace(self, filename: str, write):
+        """Write to a temporary file, then rename it over `filename`, so a crash never leaves a partial file."""
+        tmp = self.directory / f".{filename}.tmp"
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, self.directory / filename)
@@ -2,20 +2,44 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import networkx
 
-from ohm.utils.common import async_read, async_write
+from ohm.utils.common import async_read
+from ohm.utils.graph_repo.columnar_store import ColumnarTripleStore, StringTable
 from ohm.utils.graph_repo.graph_repository import SPO, GraphRepository
 
+GRAPH_SUFFIX = ".graph"
+MAX_DELTA_SEGMENTS = 16
+
+
+# first key -> second key -> ordered set of third keys, dicts keep the insertion order of the triples
+_TripleIndex = Dict[str, Dict[str, Dict[str, None]]]
+
 
 class DiGraphRepository(GraphRepository):
-    """Graph repository based on DiGraph."""
+    """Graph repository based on DiGraph.
+
+    Triples are stored in SPO, POS and OSP hash indexes, so a `select` with any bound terms only visits the matching
+    triples, and a (subject, object) pair can have several predicates. The networkx MultiDiGraph view, keyed by
+    predicate, is only built when `repo` or `json` asks for it.
+
+    `save` writes the columnar binary format of `ColumnarTripleStore`: a full snapshot the first time, then the changes
+    since the last save as delta segments, until `MAX_DELTA_SEGMENTS` of them or a change set as large as a quarter of
+    the graph triggers a new snapshot.
+    """
 
     def __init__(self, name: str | Path, **kwargs):
         super().__init__(name=str(name), **kwargs)
-        self._repo = networkx.DiGraph()
+        self._graph: Optional[networkx.MultiDiGraph] = None
+        self._spo: _TripleIndex = {}
+        self._pos: _TripleIndex = {}
+        self._osp: _TripleIndex = {}
+        self._count = 0
+        self._table = StringTable()
+        self._changes: Dict[Tuple[str, str, str], bool] = {}  # triple -> present, since the last save or load
+        self._saved_dir: Optional[Path] = None
 
     async def insert(self, subject: str, predicate: str, object_: str):
         """Insert a new triple into the directed graph repository.
@@ -29,7 +53,10 @@ class DiGraphRepository(GraphRepository):
             await my_di_graph_repo.insert(subject="Node1", predicate="connects_to", object_="Node2")
             # Adds a directed relationship: Node1 connects_to Node2
         """
-        self._repo.add_edge(subject, object_, predicate=predicate)
+        if self._index(subject, predicate, object_):
+            self._changes[(subject, predicate, object_)] = True
+            if self._graph is not None:
+                self._graph.add_edge(subject, object_, key=predicate, predicate=predicate)
 
     async def select(self, subject: str = None, predicate: str = None, object_: str = None) -> List[SPO]:
         """Retrieve triples from the directed graph repository based on specified criteria.
@@ -46,16 +73,67 @@ class DiGraphRepository(GraphRepository):
             selected_triples = await my_di_graph_repo.select(subject="Node1", predicate="connects_to")
             # Retrieves directed relationships where Node1 is the subject and the predicate is 'connects_to'.
         """
-        result = []
-        for s, o, p in self._repo.edges(data="predicate"):
-            if subject and subject != s:
-                continue
-            if predicate and predicate != p:
-                continue
-            if object_ and object_ != o:
-                continue
-            result.append(SPO(subject=s, predicate=p, object_=o))
-        return result
+        return [SPO(subject=s, predicate=p, object_=o) for s, p, o in self._match(subject, predicate, object_)]
+
+    def _match(self, subject: str = None, predicate: str = None, object_: str = None) -> Iterator[Tuple[str, str, str]]:
+        """Yield the matching (subject, predicate, object) triples through the index that covers the bound terms."""
+        if subject and predicate:
+            for o in self._spo.get(subject, {}).get(predicate, {}):
+                if not object_ or object_ == o:
+                    yield subject, predicate, o
+        elif subject and object_:
+            for p in self._osp.get(object_, {}).get(subject, {}):
+                yield subject, p, object_
+        elif subject:
+            for p, objects in self._spo.get(subject, {}).items():
+                for o in objects:
+                    yield subject, p, o
+        elif predicate:
+            for o, subjects in self._pos.get(predicate, {}).items():
+                if object_ and object_ != o:
+                    continue
+                for s in subjects:
+                    yield s, predicate, o
+        elif object_:
+            for s, predicates in self._osp.get(object_, {}).items():
+                for p in predicates:
+                    yield s, p, object_
+        else:
+            for s, predicates in self._spo.items():
+                for p, objects in predicates.items():
+                    for o in objects:
+                        yield s, p, o
+
+    def _index(self, subject: str, predicate: str, object_: str) -> bool:
+        """Add a triple to the indexes, return False if it is already there."""
+        objects = self._spo.setdefault(subject, {}).setdefault(predicate, {})
+        if object_ in objects:
+            return False
+        objects[object_] = None
+        self._pos.setdefault(predicate, {}).setdefault(object_, {})[subject] = None
+        self._osp.setdefault(object_, {}).setdefault(subject, {})[predicate] = None
+        self._count += 1
+        return True
+
+    def _unindex(self, subject: str, predicate: str, object_: str):
+        self._count -= 1
+        for index, a, b, c in (
+            (self._spo, subject, predicate, object_),
+            (self._pos, predicate, object_, subject),
+            (self._osp, object_, subject, predicate),
+        ):
+            seconds = index[a]
+            thirds = seconds[b]
+            del thirds[c]
+            if not thirds:
+                del seconds[b]
+                if not seconds:
+                    del index[a]
+
+    def _rebuild_indexes(self, triples: Iterator[Tuple[str, str, str]]):
+        self._spo, self._pos, self._osp, self._count = {}, {}, {}, 0
+        for s, p, o in triples:
+            self._index(s, p, o)
 
     async def delete(self, subject: str = None, predicate: str = None, object_: str = None) -> int:
         """Delete triples from the directed graph repository based on specified criteria.
@@ -72,48 +150,81 @@ class DiGraphRepository(GraphRepository):
             deleted_count = await my_di_graph_repo.delete(subject="Node1", predicate="connects_to")
             # Deletes directed relationships where Node1 is the subject and the predicate is 'connects_to'.
         """
-        rows = await self.select(subject=subject, predicate=predicate, object_=object_)
-        if not rows:
-            return 0
-        for r in rows:
-            self._repo.remove_edge(r.subject, r.object_)
+        rows = list(self._match(subject, predicate, object_))
+        for s, p, o in rows:
+            self._unindex(s, p, o)
+            self._changes[(s, p, o)] = False
+            if self._graph is not None:
+                self._graph.remove_edge(s, o, key=p)
         return len(rows)
 
     def json(self) -> str:
         """Convert the directed graph repository to a JSON-formatted string."""
-        m = networkx.node_link_data(self._repo)
+        m = networkx.node_link_data(self.repo)
         data = json.dumps(m)
         return data
 
     async def save(self, path: str | Path = None):
-        """Save the directed graph repository to a JSON file.
+        """Save the directed graph repository to a binary columnar store.
 
         Args:
-            path (Union[str, Path], optional): The directory path where the JSON file will be saved.
+            path (Union[str, Path], optional): The directory path where the store directory will be saved.
                 If not provided, the default path is taken from the 'root' key in the keyword arguments.
         """
-        data = self.json()
         path = path or self._kwargs.get("root")
-        if not path.exists():
-            path.mkdir(parents=True, exist_ok=True)
-        pathname = Path(path) / self.name
-        await async_write(filename=pathname.with_suffix(".json"), data=data, encoding="utf-8")
+        store = ColumnarTripleStore((Path(path) / self.name).with_suffix(GRAPH_SUFFIX))
+        incremental = (
+            store.directory == self._saved_dir
+            and store.exists
+            and len(store.deltas) < MAX_DELTA_SEGMENTS
+            and len(self._changes) * 4 < self._count
+        )
+        if not incremental:
+            store.write_snapshot(self._table, self._match())
+        elif self._changes:
+            store.write_delta(
+                self._table,
+                added=[t for t, present in self._changes.items() if present],
+                deleted=[t for t, present in self._changes.items() if not present],
+            )
+        self._saved_dir = store.directory
+        self._changes = {}
 
     async def load(self, pathname: str | Path):
-        """Load a directed graph repository from a JSON file."""
+        """Load a directed graph repository from its binary store, or from a JSON file saved by former versions."""
+        store = ColumnarTripleStore(Path(pathname).with_suffix(GRAPH_SUFFIX))
+        if store.exists:
+            self.load_store(store)
+            return
         data = await async_read(filename=pathname, encoding="utf-8")
         self.load_json(data)
 
+    def load_store(self, store: ColumnarTripleStore):
+        """Load the indexes from a binary store, without building the networkx graph."""
+        table, triples, deltas = store.load()
+        self._rebuild_indexes(table.decode(triples))
+        for added, deleted in deltas:
+            for s, p, o in table.decode(deleted):
+                if o in self._spo.get(s, {}).get(p, {}):
+                    self._unindex(s, p, o)
+            for s, p, o in table.decode(added):
+                self._index(s, p, o)
+        self._table = table
+        self._graph = None
+        self._changes = {}
+        self._saved_dir = store.directory
+        return self
+
     def load_json(self, val: str):
         """
         Loads a JSON-encoded string representing a graph structure and updates
-        the internal repository (_repo) with the parsed graph.
+        the triple indexes with the parsed graph.
 
         Args:
             val (str): A JSON-encoded string representing a graph structure.
 
         Returns:
-            self: Returns the instance of the class with the updated _repo attribute.
+            self: Returns the instance of the class with the updated indexes.
 
         Raises:
             TypeError: If val is not a valid JSON string or cannot be parsed into
@@ -122,7 +233,11 @@ class DiGraphRepository(GraphRepository):
         if not val:
             return self
         m = json.loads(val)
-        self._repo = networkx.node_link_graph(m)
+        graph = networkx.node_link_graph(m)
+        self._rebuild_indexes((s, p, o) for s, o, p in graph.edges(data="predicate"))
+        self._graph = None
+        self._changes = {}
+        self._saved_dir = None
         return self
 
     @staticmethod
@@ -137,7 +252,7 @@ class DiGraphRepository(GraphRepository):
         """
         pathname = Path(pathname)
         graph = DiGraphRepository(name=pathname.stem, root=pathname.parent)
-        if pathname.exists():
+        if pathname.exists() or pathname.with_suffix(GRAPH_SUFFIX).exists():
             await graph.load(pathname=pathname)
         return graph
 
@@ -154,5 +269,9 @@ class DiGraphRepository(GraphRepository):
 
     @property
     def repo(self):
-        """Get the underlying directed graph repository."""
-        return self._repo
+        """Get the directed graph view of the repository, built on first access."""
+        if self._graph is None:
+            self._graph = networkx.MultiDiGraph()
+            for s, p, o in self._match():
+                self._graph.add_edge(s, o, key=p, predicate=p)
+        return self._graph
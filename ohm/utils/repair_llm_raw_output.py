@@ -3,6 +3,8 @@
 # @Desc   : repair llm raw output with particular conditions
 
 import copy
+import json
+from collections import Counter
 from enum import Enum
 from typing import Callable, Optional, Union
 
@@ -11,7 +13,10 @@ from tenacity import RetryCallState, retry, stop_after_attempt, wait_fixed
 
 from ohm.config2 import Config
 from ohm.logs import logger
-from ohm.utils.custom_decoder import CustomDecoder
+from ohm.utils.decoder import CustomDecoder
+
+# how each `retry_parse_json_text` call succeeded: "json", "repair:<fix>" or "tolerant"
+json_parse_tier_stats: Counter = Counter()
 
 
 class RepairType(Enum):
@@ -188,6 +193,13 @@ def repair_invalid_json(output: str, error: str) -> str:
         example 1. json.decoder.JSONDecodeError: Expecting ',' delimiter: line 154 column 1 (char 2765)
         example 2. xxx.JSONDecodeError: Expecting property name enclosed in double quotes: line 14 column 1 (char 266)
     """
+    output, _ = _repair_invalid_json(output, error)
+    return output
+
+
+def _repair_invalid_json(output: str, error: str) -> tuple[str, Optional[str]]:
+    """`repair_invalid_json` that also returns the name of the fix applied, None if no line was changed"""
+    fix = None
     pattern = r"line ([0-9]+) column ([0-9]+)"
 
     matches = re.findall(pattern, error, re.DOTALL)
@@ -203,15 +215,15 @@ def repair_invalid_json(output: str, error: str) -> str:
         # different general problems
         if line.endswith("],"):
             # problem, redundant char `]`
-            new_line = line.replace("]", "")
+            new_line, fix = line.replace("]", ""), "redundant_bracket"
         elif line.endswith("},") and not output.endswith("},"):
             # problem, redundant char `}`
-            new_line = line.replace("}", "")
+            new_line, fix = line.replace("}", ""), "redundant_brace"
         elif line.endswith("},") and output.endswith("},"):
-            new_line = line[:-1]
+            new_line, fix = line[:-1], "trailing_comma"
         elif (rline[col_no] in ["'", '"']) and (line.startswith('"') or line.startswith("'")) and "," not in line:
             # problem, `"""` or `'''` without `,`
-            new_line = f",{line}"
+            new_line, fix = f",{line}", "leading_comma"
         elif col_no - 1 >= 0 and rline[col_no - 1] in ['"', "'"]:
             # backslash problem like \" in the output
             char = rline[col_no - 1]
@@ -223,15 +235,16 @@ def repair_invalid_json(output: str, error: str) -> str:
                 + "\\"
                 + rline[col_no + nearest_char_idx :]
             )
+            fix = "unescaped_quote"
         elif '",' not in line and "," not in line and '"' not in line:
-            new_line = f'{line}",'
+            new_line, fix = f'{line}",', "unclosed_string"
         elif not line.endswith(","):
             # problem, miss char `,` at the end.
-            new_line = f"{line},"
+            new_line, fix = f"{line},", "missing_comma"
         elif "," in line and len(line) == 1:
-            new_line = f'"{line}'
+            new_line, fix = f'"{line}', "lone_comma"
         elif '",' in line:
-            new_line = line[:-2] + "',"
+            new_line, fix = line[:-2] + "',", "quote_before_comma"
         else:
             new_line = line
 
@@ -239,7 +252,7 @@ def repair_invalid_json(output: str, error: str) -> str:
         output = "\n".join(arr)
         logger.info(f"repair_invalid_json, raw error: {error}")
 
-    return output
+    return output, fix
 
 
 def run_after_exp_and_passon_next_retry(logger: "loguru.Logger") -> Callable[["RetryCallState"], None]:
@@ -301,9 +314,41 @@ def retry_parse_json_text(output: str) -> Union[list, dict]:
     # logger.debug(f"output to json decode:\n{output}")
 
     # if CONFIG.repair_llm_output is True, it will try to fix output until the retry break
-    parsed_data = CustomDecoder(strict=False).decode(output)
+    return _parse_json_tiered(output)
+
 
-    return parsed_data
+def _parse_json_tiered(output: str) -> Union[list, dict]:
+    """Parse with the C json decoder first, which handles the common case of valid JSON.
+
+    On failure the pure-Python tolerant scanner of CustomDecoder runs on the original output. Only if it fails too,
+    and `repair_llm_output` is enabled, one targeted repair based on the error position is tried with the C decoder,
+    except on text with triple quotes, whose multi-line values the position-based repairs would corrupt. Otherwise
+    the error of the tolerant scanner is raised, which the retry loop repairs.
+    """
+    try:
+        parsed_data = json.loads(output, strict=False)
+        json_parse_tier_stats["json"] += 1
+        return parsed_data
+    except json.JSONDecodeError as e:
+        json_error = e
+
+    try:
+        parsed_data = CustomDecoder(strict=False).decode(output, fast_path=False)
+        json_parse_tier_stats["tolerant"] += 1
+        return parsed_data
+    except json.JSONDecodeError as e:
+        tolerant_error = e
+
+    if Config.default().repair_llm_output and '"""' not in output and "'''" not in output:
+        repaired_output, fix = _repair_invalid_json(output, str(json_error))
+        if fix:
+            try:
+                parsed_data = json.loads(repaired_output, strict=False)
+                json_parse_tier_stats[f"repair:{fix}"] += 1
+                return parsed_data
+            except json.JSONDecodeError:
+                pass
+    raise tolerant_error
 
 
 def extract_content_from_output(content: str, right_key: str = "[/CONTENT]"):
@@ -1,6 +1,10 @@
 import asyncio
+import atexit
+import concurrent.futures
 import os
+import threading
 import typing
+from collections import deque
 from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, Literal, Optional, Union
@@ -13,16 +17,11 @@ from playwright.sync_api import Page as SyncPage
 from pydantic import BaseModel, Field, PrivateAttr
 
 from ohm.const import ohm_REPORTER_DEFAULT_URL
-from ohm.logs import create_llm_stream_queue, get_llm_stream_queue
+from ohm.logs import create_llm_stream_queue, get_llm_stream_queue, logger
 
 if typing.TYPE_CHECKING:
     from ohm.roles.role import Role
 
-try:
-    import requests_unixsocket as requests
-except ImportError:
-    import requests
-
 from contextvars import ContextVar
 
 CURRENT_ROLE: ContextVar["Role"] = ContextVar("role")
@@ -45,6 +44,163 @@ class BlockType(str, Enum):
 END_MARKER_NAME = "end_marker"
 END_MARKER_VALUE = "\x18\x19\x1B\x18\n"
 
+REPORT_QUEUE_SIZE = 10000
+REPORT_BATCH_SIZE = 256
+
+
+class _ReportSender:
+    """Sends the reports for one callback URL over a long-lived session.
+
+    Lives on the transport's event loop. Each reporter has its own queue, and the queues take turns, one POST each, so
+    a reporter that reports a lot does not hold back the others: the reports of one reporter are sent in order, those
+    of different reporters interleaved. Consecutive string values of the same reporter and name (terminal output, LLM
+    stream content) are merged into one POST. A report may come with a future, resolved once it has been posted, and
+    so every report queued before it by the same reporter.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        # reporter uuid -> its reports, with the future to resolve once each is sent
+        self._queues: dict[str, deque[tuple[dict, Optional[concurrent.futures.Future]]]] = {}
+        self._wakeup = asyncio.Event()
+        self._unfinished = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._session: Optional[ClientSession] = None
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, data: dict, sent: Optional[concurrent.futures.Future] = None):
+        self._queues.setdefault(data.get("uuid"), deque()).append((data, sent))
+        self._unfinished += 1
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def join(self):
+        """Wait until every report queued so far has been sent."""
+        await self._idle.wait()
+
+    def _resolve_url(self) -> tuple[str, Optional[str]]:
+        """Return the URL to post to and, for a `+unix` URL, the path of the unix socket."""
+        _result = urlparse(self.url)
+        if not _result.scheme.endswith("+unix"):
+            return self.url, None
+        parsed_list = list(_result)
+        parsed_list[0] = parsed_list[0][:-5]
+        parsed_list[1] = "fake.org"
+        return urlunparse(parsed_list), unquote(_result.netloc)
+
+    def _get_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            session_kwargs = {}
+            _, socket_path = self._resolve_url()
+            if socket_path:
+                session_kwargs["connector"] = UnixConnector(path=socket_path)
+            self._session = ClientSession(**session_kwargs)
+        return self._session
+
+    async def _run(self):
+        request_url, _ = self._resolve_url()
+        while True:
+            while not self._queues:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            reports = self._take()
+            data = reports[0][0]
+            for other, _ in reports[1:]:
+                data = {**data, "value": data["value"] + other["value"]}
+            try:
+                async with self._get_session().post(request_url, json=data) as resp:
+                    resp.raise_for_status()
+            except Exception as e:
+                logger.warning(f"Failed to report {data.get('name')} to {self.url}: {e}")
+            for _, sent in reports:
+                _transport.slots.release()
+                if sent is not None and not sent.done():
+                    sent.set_result(None)
+            self._unfinished -= len(reports)
+            if not self._unfinished:
+                self._idle.set()
+
+    def _take(self) -> list[tuple[dict, Optional[concurrent.futures.Future]]]:
+        """Take the reports of the next POST from the reporter whose turn it is, then move it to the back."""
+        key = next(iter(self._queues))
+        queue = self._queues.pop(key)
+        reports = [queue.popleft()]
+        while queue and len(reports) < REPORT_BATCH_SIZE and self._mergeable(reports[-1][0], queue[0][0]):
+            reports.append(queue.popleft())
+        if queue:
+            self._queues[key] = queue
+        return reports
+
+    @staticmethod
+    def _mergeable(prev: dict, data: dict) -> bool:
+        return (
+            isinstance(prev["value"], str)
+            and isinstance(data["value"], str)
+            and data["name"] != END_MARKER_NAME
+            and "extra" not in prev
+            and "extra" not in data
+            and {k: v for k, v in prev.items() if k != "value"} == {k: v for k, v in data.items() if k != "value"}
+        )
+
+
+class _ReportTransport:
+    """Background thread running the senders, shared by all reporters of the process.
+
+    Both the sync and the async API only enqueue, so reporting never waits for the network. The queue is bounded by
+    `REPORT_QUEUE_SIZE` in-flight reports: producers wait for a free slot when the callback server falls behind.
+    """
+
+    def __init__(self):
+        self.slots = threading.BoundedSemaphore(REPORT_QUEUE_SIZE)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._senders: dict[str, _ReportSender] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="ohm-reporter", daemon=True).start()
+                atexit.register(self.flush, 5)
+            return self._loop
+
+    def _put(self, url: str, data: dict, sent: Optional[concurrent.futures.Future] = None):
+        """Runs on the transport loop."""
+        if url not in self._senders:
+            self._senders[url] = _ReportSender(url)
+        self._senders[url].put(data, sent)
+
+    def submit(self, url: str, data: dict):
+        """Enqueue a report, waiting only while the queue is full."""
+        loop = self._ensure_loop()
+        self.slots.acquire()
+        loop.call_soon_threadsafe(self._put, url, data)
+
+    async def async_submit(self, url: str, data: dict, wait_sent: bool = False):
+        """Enqueue a report and, if `wait_sent`, wait until it has been posted, without waiting for later reports."""
+        loop = self._ensure_loop()
+        if not self.slots.acquire(blocking=False):
+            await asyncio.to_thread(self.slots.acquire)
+        sent = concurrent.futures.Future() if wait_sent else None
+        loop.call_soon_threadsafe(self._put, url, data, sent)
+        if sent is not None:
+            await asyncio.wrap_future(sent)
+
+    async def _join(self):
+        for sender in list(self._senders.values()):
+            await sender.join()
+
+    def flush(self, timeout: Optional[float] = None):
+        if self._loop is not None and self._loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self._join(), self._loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Failed to flush the reports: {e}")
+
+
+_transport = _ReportTransport()
+
 
 class ResourceReporter(BaseModel):
     """Base class for resource reporting."""
@@ -105,29 +261,15 @@ class ResourceReporter(BaseModel):
             return
 
         data = self._format_data(value, name, extra)
-        resp = requests.post(self.callback_url, json=data)
-        resp.raise_for_status()
-        return resp.text
+        _transport.submit(self.callback_url, data)
 
     async def _async_report(self, value: Any, name: str, extra: Optional[dict] = None):
         if not self.callback_url:
             return
 
         data = self._format_data(value, name, extra)
-        url = self.callback_url
-        _result = urlparse(url)
-        sessiion_kwargs = {}
-        if _result.scheme.endswith("+unix"):
-            parsed_list = list(_result)
-            parsed_list[0] = parsed_list[0][:-5]
-            parsed_list[1] = "fake.org"
-            url = urlunparse(parsed_list)
-            sessiion_kwargs["connector"] = UnixConnector(path=unquote(_result.netloc))
-
-        async with ClientSession(**sessiion_kwargs) as client:
-            async with client.post(url, json=data) as resp:
-                resp.raise_for_status()
-                return await resp.text()
+        # the stream is complete once its end marker is delivered
+        await _transport.async_submit(self.callback_url, data, wait_sent=name == END_MARKER_NAME)
 
     def _format_data(self, value, name, extra):
         data = self.model_dump(mode="json", exclude=("callback_url", "llm_stream"))
@@ -8,6 +8,7 @@
 import ast
 import traceback
 from enum import Enum
+from functools import lru_cache
 from typing import Dict, Generator, List, Optional, Set, Tuple
 
 import tree_sitter_python
@@ -50,6 +51,17 @@ def traverse_tree(node: Node) -> Generator[Node, None, None]:
             depth -= 1
 
 
+def syntax_error_line(code: str) -> Optional[int]:
+    """Return the line of the syntax error of the code, None if it parses."""
+    try:
+        ast.parse(code)
+        return None
+    except SyntaxError as e:
+        return e.lineno or 1
+    except MemoryError:
+        return code.count("\n") + 1
+
+
 def syntax_check(code, verbose=False):
     try:
         ast.parse(code)
@@ -60,23 +72,85 @@ def syntax_check(code, verbose=False):
         return False
 
 
+@lru_cache(maxsize=1)
+def get_parser() -> Parser:
+    return Parser(Language(tree_sitter_python.language()))
+
+
 def code_extract(text: str) -> str:
+    """
+    Extract the span of lines that is valid Python with the most non-blank lines, the earliest and shortest on ties.
+
+    The text is parsed once with tree-sitter, and the lines of the top-level nodes without a syntax error give a
+    lower bound of the longest span. Only the spans that could beat it are then checked with `ast`, longest first, so
+    a code block surrounded by a few lines of prose takes a handful of parses instead of one for every pair of lines.
+
+    :param text: The text, such as a raw LLM output, to extract the code from.
+    :return: The longest valid span, or the first line if there is none.
+    """
     lines = text.split("\n")
+    # counts[k] is the number of non-blank lines in lines[:k]
+    counts = [0]
+    for line in lines:
+        counts.append(counts[-1] + (1 if line.strip() else 0))
+
+    # A valid span found by tree-sitter bounds the length, the spans below it are never parsed.
+    bound = 0
+    for i, j in _code_spans(text, lines):
+        current_length = counts[j + 1] - counts[i]
+        if current_length > bound and syntax_check("\n".join(lines[i : j + 1])):
+            bound = current_length
+
     longest_line_pair = (0, 0)
     longest_so_far = 0
-
     for i in range(len(lines)):
-        for j in range(i + 1, len(lines)):
-            current_lines = "\n".join(lines[i : j + 1])
-            if syntax_check(current_lines):
-                current_length = sum(1 for line in lines[i : j + 1] if line.strip())
-                if current_length > longest_so_far:
-                    longest_so_far = current_length
-                    longest_line_pair = (i, j)
+        # An earlier start wins a tie, so once a span is found only longer ones count.
+        min_length = max(bound, longest_so_far + 1)
+        if counts[-1] - counts[i] < min_length:
+            break
+        j = len(lines) - 1
+        while j > i:
+            current_length = counts[j + 1] - counts[i]
+            if current_length < min_length:
+                break
+            error_line = syntax_error_line("\n".join(lines[i : j + 1]))
+            if error_line is not None:
+                # Python reports the first line no continuation can fix, the shorter spans still containing it fail too.
+                j = min(j, i + error_line - 1) - 1
+                continue
+            # The longest span starting at i, shortened to the first valid end with as many non-blank lines
+            first = max(i + 1, counts.index(counts[i] + current_length) - 1)
+            for k in range(first, j):
+                if syntax_check("\n".join(lines[i : k + 1])):
+                    j = k
+                    break
+            longest_so_far = current_length
+            longest_line_pair = (i, j)
+            break
 
     return "\n".join(lines[longest_line_pair[0] : longest_line_pair[1] + 1])
 
 
+def _code_spans(text: str, lines: List[str]) -> List[Tuple[int, int]]:
+    """Return the (first, last) lines of the runs of lines untouched by top-level nodes with a syntax error."""
+    tree = get_parser().parse(bytes(text, "utf8"))
+    root_node = tree.root_node
+    bad_lines = [False] * len(lines)
+    for node in root_node.children:
+        if node.type == "ERROR" or node.has_error:
+            for row in range(node.start_point[0], min(node.end_point[0] + 1, len(lines))):
+                bad_lines[row] = True
+
+    spans = []
+    start = 0
+    for i, bad in enumerate(bad_lines + [True]):
+        if bad:
+            if i - 1 > start:
+                spans.append((start, i - 1))
+            start = i + 1
+    return spans
+
+
 def get_definition_name(node: Node) -> str:
     for child in node.children:
         if child.type == NodeType.IDENTIFIER.value:
@@ -134,8 +208,7 @@ def sanitize(code: str, entrypoint: Optional[str] = None) -> str:
     """
     code = code_extract(code)
     code_bytes = bytes(code, "utf8")
-    parser = Parser(Language(tree_sitter_python.language()))
-    tree = parser.parse(code_bytes)
+    tree = get_parser().parse(code_bytes)
     class_names = set()
     function_names = set()
     variable_names = set()
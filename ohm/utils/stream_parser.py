@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : stream_parser.py
+@Desc    : Incremental extraction of top-level JSON fields from a streamed `[CONTENT]{...}[/CONTENT]` LLM output.
+"""
+import json
+from typing import Any
+
+CODE_FENCES = ("```json", "```")
+
+
+class ContentStreamParser:
+    """Feed LLM deltas in, get top-level `(key, value)` pairs out as soon as each value is complete.
+
+    Only strictly valid JSON values are emitted; anything else is left to the tolerant repair pass that runs on the
+    full output. Each character is scanned once, so the total cost is linear in the output length.
+
+    Attributes:
+        malformed: The end tag arrived without any JSON object after a start tag opening a line, the output can be
+            rejected early. A start tag within a line may be mentioned in prose, it is not enough to reject.
+        finished: The object has been closed and the end tag received, the rest of the stream is not needed.
+    """
+
+    def __init__(self, start_tag: str = "[CONTENT]", end_tag: str = "[/CONTENT]"):
+        self.start_tag = start_tag
+        self.end_tag = end_tag
+        self.buffer = ""
+        self.malformed = False
+        self.finished = False
+
+        self._last_start = -1  # index of the last start tag found, if it opens a line
+        self._body_start = -1  # index right after the start tag
+        self._pos = 0  # next index to scan
+        self._depth = 0
+        self._closed = False  # the top-level object has been fully scanned
+        self._in_string = False
+        self._escape = False
+        self._segment_start = -1  # start of the current `"key": value` segment
+        self._value_start = -1
+
+    def feed(self, delta: str) -> list[tuple[str, Any]]:
+        if self.finished or self.malformed:
+            return []
+        end_search = max(0, len(self.buffer) - len(self.end_tag))
+        self.buffer += delta
+        fields = []
+        while not self._closed and self._pos < len(self.buffer):
+            if self._body_start < 0 and not self._find_start_tag():
+                break
+            fields += self._scan()
+            if self._body_start >= 0:
+                break  # wait for more text, otherwise a mention of the start tag in prose was skipped
+
+        end_idx = self.buffer.find(self.end_tag, end_search)
+        if end_idx >= 0 and self._closed:
+            self.finished = True
+        elif self._segment_start < 0 and self._last_start >= 0:
+            self.malformed = self.buffer.find(self.end_tag, max(self._last_start, end_search)) >= 0
+        return fields
+
+    def _find_start_tag(self) -> bool:
+        idx = self.buffer.find(self.start_tag, max(0, self._pos - len(self.start_tag) + 1))
+        if idx < 0:
+            self._pos = len(self.buffer)
+            return False
+        self._last_start = idx if not self.buffer[self.buffer.rfind("\n", 0, idx) + 1 : idx].strip() else -1
+        self._body_start = self._pos = idx + len(self.start_tag)
+        return True
+
+    def _scan(self) -> list[tuple[str, Any]]:
+        fields = []
+        buffer = self.buffer
+        while self._pos < len(buffer) and not self._closed:
+            i, ch = self._pos, buffer[self._pos]
+            if self._depth == 0:
+                rest = buffer[i : i + len(CODE_FENCES[0])]
+                if any(len(rest) < len(f) and f.startswith(rest) for f in CODE_FENCES):
+                    break  # maybe a fence split across deltas, wait for more text
+                fence = next((f for f in CODE_FENCES if rest.startswith(f)), None)
+                if fence:
+                    self._pos += len(fence)
+                    continue
+                if ch == "{":
+                    self._depth = 1
+                    self._segment_start = i + 1
+                elif not ch.isspace():
+                    self._body_start = -1  # not our object, look for the next start tag
+                    self._pos = i
+                    break
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(i, fields)
+                    self._closed = True
+            elif self._depth == 1 and ch == ":" and self._value_start < 0:
+                self._value_start = i + 1
+            elif self._depth == 1 and ch == ",":
+                self._emit(i, fields)
+                self._segment_start = i + 1
+            self._pos += 1
+        return fields
+
+    def _emit(self, end: int, fields: list):
+        if self._value_start < 0:
+            return
+        try:
+            key = json.loads(self.buffer[self._segment_start : self._value_start - 1])
+            value = json.loads(self.buffer[self._value_start : end])
+        except json.JSONDecodeError:
+            pass
+        else:
+            if isinstance(key, str):
+                fields.append((key, value))
+        self._value_start = -1